@@ -11,11 +11,13 @@ __version__ = "2026.02.18"
 
 from .database import ErrorDatabase, get_error_db, DEFAULT_CATEGORIES
 from .blueprint import create_blueprint, init_error_tracker
+from .middleware import InjectDebugButton
 
 __all__ = [
     "ErrorDatabase",
     "get_error_db",
     "create_blueprint",
     "init_error_tracker",
+    "InjectDebugButton",
     "DEFAULT_CATEGORIES",
 ]
@@ -3,9 +3,78 @@ Flask Blueprint for the Error Tracker.
 Register this blueprint in any Flask app to add error tracking routes.
 """
 
+import json
 import traceback
-from flask import Blueprint, render_template, request, jsonify
-from .database import ErrorDatabase, get_error_db
+from typing import Dict, Optional, Tuple
+from flask import Blueprint, Response, make_response, render_template, request, jsonify
+from markupsafe import Markup
+from werkzeug.exceptions import HTTPException, UnsupportedMediaType
+from .database import ErrorDatabase, get_error_db, orjson
+from .middleware import InjectDebugButton
+
+try:
+    import ormsgpack  # optional MessagePack request bodies: pip install agentic-debug-tools[msgpack]
+except ImportError:
+    ormsgpack = None
+
+_MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Most errors accepted per /api/log-frontend-error request; the rest are dropped and counted
+MAX_FRONTEND_BATCH = 500
+
+# Largest page /api/errors returns (the dashboard's export asks for 1000)
+MAX_LIST_LIMIT = 1000
+
+
+def _json(data, status: int = 200) -> Response:
+    """JSON response via orjson when installed, else flask.jsonify"""
+    if orjson is None:
+        response = jsonify(data)
+        response.status_code = status
+        return response
+    return Response(orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS),
+                    status=status, mimetype='application/json')
+
+
+def _request_payload():
+    """
+    Parse the request body as an object: MessagePack when the Content-Type says so,
+    otherwise JSON whatever the Content-Type.
+
+    navigator.sendBeacon() posts text/plain, which request.get_json() rejects.
+    Returns {} for an empty body and None if it isn't an object.
+    """
+    msgpack = request.mimetype in _MSGPACK_MIMETYPES
+    if msgpack and ormsgpack is None:
+        raise UnsupportedMediaType('MessagePack bodies need the msgpack extra (ormsgpack)')
+    body = request.get_data(cache=False)
+    if not body:
+        return {}
+    try:
+        if msgpack:
+            data = ormsgpack.unpackb(body)
+        else:
+            data = orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _bad_payload() -> Response:
+    return _json({'success': False, 'error': 'Request body must be a JSON or MessagePack object'}, 400)
+
+
+def _page_cursor(error: Dict) -> str:
+    """Cursor for the page after this row: its sort key, '<id>:<last_occurred>'"""
+    return f"{error['id']}:{error['last_occurred']}"
+
+
+def _parse_page_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    """(last_occurred, id) from a _page_cursor() string, or None if it is malformed"""
+    error_id, sep, last_occurred = cursor.partition(':')
+    if not sep or not error_id.isdigit():
+        return None
+    return last_occurred, int(error_id)
 
 
 def create_blueprint(error_db: ErrorDatabase = None, url_prefix: str = '') -> Blueprint:
@@ -27,18 +96,21 @@ def create_blueprint(error_db: ErrorDatabase = None, url_prefix: str = '') -> Bl
         static_url_path='/error-tracker-static',
     )
 
-    def db() -> ErrorDatabase:
-        return error_db or get_error_db()
+    # Resolved once here; the route closures below use it directly
+    if error_db is None:
+        error_db = get_error_db()
 
     # ── Dashboard ──
 
     @bp.route('/error-log')
     def error_log_page():
-        """Error log dashboard"""
-        error_database = db()
-        stats = error_database.get_stats()
-        errors = error_database.get_errors(limit=100)
-        return render_template('error_log.html', stats=stats, errors=errors)
+        """Error log dashboard. Revalidated by ETag, so an unchanged page costs a 304, not a resend."""
+        stats = error_db.get_stats()
+        errors = error_db.get_errors(limit=100)
+        response = make_response(render_template('error_log.html', stats=stats, errors=errors))
+        response.add_etag()
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
 
     # ── API: List / Filter ──
 
@@ -46,78 +118,90 @@ def create_blueprint(error_db: ErrorDatabase = None, url_prefix: str = '') -> Bl
     def get_errors_api():
         category = request.args.get('category')
         include_resolved = request.args.get('include_resolved', 'false').lower() == 'true'
-        limit = int(request.args.get('limit', 100))
-        offset = int(request.args.get('offset', 0))
-        error_database = db()
-        errors = error_database.get_errors(
+        limit = min(max(request.args.get('limit', 100, type=int), 1), MAX_LIST_LIMIT)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        after = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            after = _parse_page_cursor(cursor)
+            if after is None:
+                return _json({'success': False, 'error': 'Invalid cursor'}, 400)
+        errors = error_db.get_errors(
             category=category if category != 'all' else None,
-            include_resolved=include_resolved, limit=limit, offset=offset,
+            include_resolved=include_resolved, limit=limit, offset=offset, after=after,
         )
-        stats = error_database.get_stats()
-        return jsonify({'success': True, 'errors': errors, 'stats': stats,
-                        'categories': error_database.categories})
+        stats = error_db.get_stats()
+        next_cursor = _page_cursor(errors[-1]) if len(errors) == limit else None
+        return _json({'success': True, 'errors': errors, 'stats': stats,
+                      'categories': error_db.categories, 'next_cursor': next_cursor})
 
     # ── API: Detail ──
 
     @bp.route('/api/errors/<int:error_id>')
     def get_error_detail_api(error_id):
-        error = db().get_error_detail(error_id)
+        error = error_db.get_error_detail(error_id)
         if not error:
-            return jsonify({'success': False, 'error': 'Error not found'}), 404
-        return jsonify({'success': True, 'error': error})
+            return _json({'success': False, 'error': 'Error not found'}, 404)
+        return _json({'success': True, 'error': error})
 
     # ── API: Debug Report ──
 
     @bp.route('/api/errors/<int:error_id>/debug-report')
     def get_debug_report_api(error_id):
         occurrence_id = request.args.get('occurrence_id', type=int)
-        report = db().generate_debug_report(error_id, occurrence_id)
-        return jsonify({'success': True, 'debug_code': report})
+        report = error_db.generate_debug_report(error_id, occurrence_id)
+        return _json({'success': True, 'debug_code': report})
 
     # ── API: Add Note (without resolving) ──
 
     @bp.route('/api/errors/<int:error_id>/note', methods=['POST'])
     def add_note_api(error_id):
-        data = request.get_json() or {}
+        data = _request_payload()
+        if data is None:
+            return _bad_payload()
         note = data.get('note', '').strip()
         if not note:
-            return jsonify({'success': False, 'error': 'Note is required'}), 400
-        success = db().add_note(error_id, note)
-        return jsonify({'success': success})
+            return _json({'success': False, 'error': 'Note is required'}, 400)
+        success = error_db.add_note(error_id, note)
+        return _json({'success': success})
 
     # ── API: Resolve ──
 
     @bp.route('/api/errors/<int:error_id>/resolve', methods=['POST'])
     def resolve_error_api(error_id):
-        data = request.get_json() or {}
-        success = db().mark_resolved(error_id, data.get('notes'))
-        return jsonify({'success': success})
+        data = _request_payload()
+        if data is None:
+            return _bad_payload()
+        success = error_db.mark_resolved(error_id, data.get('notes'))
+        return _json({'success': success})
 
     # ── API: Delete ──
 
     @bp.route('/api/errors/<int:error_id>', methods=['DELETE'])
     def delete_error_api(error_id):
-        return jsonify({'success': db().delete_error(error_id)})
+        return _json({'success': error_db.delete_error(error_id)})
 
     # ── API: Clear Resolved ──
 
     @bp.route('/api/errors/clear-resolved', methods=['POST'])
     def clear_resolved_api():
-        return jsonify({'success': True, 'cleared': db().clear_resolved()})
+        return _json({'success': True, 'cleared': error_db.clear_resolved()})
 
     # ── API: Stats (for live polling) ──
 
     @bp.route('/api/errors/stats')
     def get_stats_api():
-        return jsonify(db().get_stats())
+        return _json(error_db.get_stats())
 
     # ── API: Receive Backend Errors ──
 
     @bp.route('/api/log-error', methods=['POST'])
     def log_backend_error():
-        data = request.get_json() or {}
+        data = _request_payload()
+        if data is None:
+            return _bad_payload()
         try:
-            db().log_error(
+            error_db.log_error(
                 category=data.get('category', 'server'),
                 error_type=data.get('error_type', 'Error'),
                 error_message=data.get('error_message', 'Unknown error'),
@@ -127,21 +211,25 @@ def create_blueprint(error_db: ErrorDatabase = None, url_prefix: str = '') -> Bl
                 http_status=data.get('extra_data', {}).get('status'),
                 extra_data=data.get('extra_data'),
             )
-            return jsonify({'success': True})
+            return _json({'success': True})
         except Exception:
-            return jsonify({'success': False}), 500
+            return _json({'success': False}, 500)
 
     # ── API: Receive Frontend Errors ──
 
     @bp.route('/api/log-frontend-error', methods=['POST'])
     def log_frontend_error():
-        data = request.get_json() or {}
+        data = _request_payload()
+        if data is None:
+            return _bad_payload()
         errors = data.get('errors', [])
-        error_database = db()
-        logged = 0
-        for err in errors:
+        if not isinstance(errors, list):
+            return _bad_payload()
+        dropped = max(0, len(errors) - MAX_FRONTEND_BATCH)
+        items = []
+        for err in errors[:MAX_FRONTEND_BATCH]:
             try:
-                error_database.log_error(
+                items.append(dict(
                     category='frontend',
                     error_type=err.get('error_type', 'FrontendError'),
                     error_message=err.get('error_message', 'Unknown error'),
@@ -156,17 +244,21 @@ def create_blueprint(error_db: ErrorDatabase = None, url_prefix: str = '') -> Bl
                         'viewport': err.get('viewport'),
                         'stack': err.get('extra_data', {}).get('stack'),
                     }
-                )
-                logged += 1
+                ))
             except Exception:
                 pass
-        return jsonify({'success': True, 'logged': logged})
+        try:
+            logged = error_db.log_errors_bulk(items) if items else 0
+        except Exception:
+            logged = 0
+        return _json({'success': True, 'logged': logged, 'dropped': dropped})
 
     return bp
 
 
 def init_error_tracker(app, error_db: ErrorDatabase = None, url_prefix: str = '',
-                       catch_flask_errors: bool = True, debug_button: str = 'errors-only'):
+                       catch_flask_errors: bool = True, debug_button: str = 'errors-only',
+                       inject: str = 'middleware', max_inject_body_bytes: int = 2_000_000):
     """
     One-call setup: registers the blueprint and optionally installs a global
     Flask error handler that logs unhandled exceptions.
@@ -175,28 +267,45 @@ def init_error_tracker(app, error_db: ErrorDatabase = None, url_prefix: str = ''
         app: The Flask application.
         error_db: An ErrorDatabase instance. Uses singleton if not provided.
         url_prefix: URL prefix for all error tracker routes.
-        catch_flask_errors: If True, registers a global errorhandler(Exception).
+        catch_flask_errors: If True, registers a global errorhandler(Exception) that logs
+            unhandled exceptions as 'server' errors. HTTP errors (404, abort(...)) pass through.
         debug_button: Controls the floating debug button on every HTML page.
             'errors-only' (default) — hidden, appears only when JS errors are detected.
             'always'                — visible on every page regardless of errors.
             False / None            — disabled, no auto-injection.
+        inject: How the debug button snippet gets into HTML pages.
+            'middleware' (default) — WSGI middleware inserts it before </body>,
+                                     searching only the final body chunk.
+            'after_request'        — legacy hook that buffers the full response body.
+            'template'             — no auto-injection; render {{ error_tracker_snippet }}
+                                     in your base template instead.
+            The {{ error_tracker_snippet }} template variable is available in every mode.
+        max_inject_body_bytes: HTML bodies larger than this are left untouched rather
+            than copied to splice in the snippet; None means no limit. Streamed responses
+            are never buffered by 'after_request'; use 'middleware' or 'template' for
+            streaming HTML.
 
     Returns:
         The registered Blueprint.
     """
+    if inject not in ('middleware', 'after_request', 'template'):
+        raise ValueError(f"inject must be 'middleware', 'after_request' or 'template', not {inject!r}")
+    if error_db is None:
+        error_db = get_error_db()
     bp = create_blueprint(error_db=error_db, url_prefix=url_prefix)
     app.register_blueprint(bp, url_prefix=url_prefix)
 
     if catch_flask_errors:
-        @app.errorhandler(Exception)
         def _handle_exception(e):
-            db = error_db or get_error_db()
-            db.log_error(
+            if isinstance(e, HTTPException):
+                # 404s, 405s, abort(403)... are responses, not server errors
+                return e
+            error_db.log_error(
                 category='server',
                 error_type=type(e).__name__,
                 error_message=str(e),
                 context=f'{request.method} {request.path}',
-                stack_trace=traceback.format_exc(),
+                stack_trace=''.join(traceback.format_exception(type(e), e, e.__traceback__)),
                 request_url=request.url,
                 http_status=500,
                 extra_data={
@@ -205,7 +314,9 @@ def init_error_tracker(app, error_db: ErrorDatabase = None, url_prefix: str = ''
                     'remote_addr': request.remote_addr,
                 }
             )
-            return jsonify({'error': 'Internal server error'}), 500
+            return _json({'error': 'Internal server error'}, 500)
+
+        app.register_error_handler(Exception, _handle_exception)
 
     # ── Auto-inject debug button + error collector into every HTML response ──
     if debug_button:
@@ -221,19 +332,38 @@ def init_error_tracker(app, error_db: ErrorDatabase = None, url_prefix: str = ''
         _snippet_bytes = _snippet.encode('utf-8')
         _close_body = b'</body>'
 
-        @app.after_request
-        def _inject_debug_button(response):
-            # Only inject into HTML responses that contain </body>
-            if (response.content_type
-                    and 'text/html' in response.content_type
-                    and response.status_code < 400
-                    and not response.direct_passthrough):
-                try:
-                    data = response.get_data()
-                    if _close_body in data:
-                        response.set_data(data.replace(_close_body, _snippet_bytes + _close_body, 1))
-                except Exception:
-                    pass  # Never break the response
-            return response
+        @app.context_processor
+        def _error_tracker_snippet():
+            return {'error_tracker_snippet': Markup(_snippet)}
+
+        if inject == 'middleware':
+            app.wsgi_app = InjectDebugButton(app.wsgi_app, _snippet_bytes,
+                                             max_body_bytes=max_inject_body_bytes)
+
+        elif inject == 'after_request':
+            @app.after_request
+            def _inject_debug_button(response):
+                # Only inject into HTML responses that contain </body>
+                if (response.content_type
+                        and 'text/html' in response.content_type
+                        and response.status_code < 400
+                        and not response.direct_passthrough
+                        and not response.is_streamed):
+                    # get_data() would pull the whole body into memory: skip tiny and huge ones.
+                    # max_inject_body_bytes=None means no limit, as in the middleware.
+                    length = response.calculate_content_length()
+                    if length is not None and (
+                            length < len(_close_body)
+                            or (max_inject_body_bytes is not None and length > max_inject_body_bytes)):
+                        return response
+                    try:
+                        data = response.get_data()
+                        # </body> sits at the end of the document: search backwards, splice once
+                        idx = data.rfind(_close_body)
+                        if idx != -1:
+                            response.set_data(data[:idx] + _snippet_bytes + data[idx:])
+                    except Exception:
+                        pass  # Never break the response
+                return response
 
     return bp
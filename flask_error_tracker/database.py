@@ -6,13 +6,26 @@ Default categories: database, api, frontend, server, worker, test, content_proce
 Custom categories can be added via configuration.
 """
 
+import atexit
+import contextlib
+import copy
+import functools
+import queue
 import sqlite3
+import sys
 import json
+import threading
+import time
+import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import hashlib
-import yaml
+
+try:
+    import orjson  # optional speedup: pip install agentic-debug-tools[fast]
+except ImportError:
+    orjson = None
 
 
 DEFAULT_CATEGORIES = {
@@ -25,6 +38,158 @@ DEFAULT_CATEGORIES = {
     'content_processing': 'Content Processing',
 }
 
+# Seconds a get_stats() result is reused for the dashboard's live polling (writes drop it sooner)
+STATS_CACHE_TTL = 2.0
+
+# Idle read-only connections kept for reuse; extra concurrent readers open and close their own
+READER_POOL_SIZE = 4
+
+# Background writer (async_writes=True): flush after this many queued items or this many seconds
+WRITER_BATCH_SIZE = 128
+WRITER_FLUSH_INTERVAL = 0.1
+_STOP_WRITER = object()
+
+# UPSERT (log_error's dedup) needs SQLite 3.24+; from 3.35 it also returns the id (RETURNING)
+MIN_SQLITE_VERSION = (3, 24, 0)
+_RETURNING_SQLITE_VERSION = (3, 35, 0)
+
+# Bump when _generate_error_hash changes; _init_db rehashes older databases (PRAGMA user_version)
+_HASH_VERSION = 1
+
+# Columns returned by listings (get_errors, also the dashboard's export): everything but the
+# internal dedup hashes; detail views still select every column
+_LIST_COLS = ("id, category, error_type, error_message, first_occurred, last_occurred, "
+              "occurrence_count, resolved, resolution_notes, created_at")
+
+# Hot-path statements kept as module constants: sqlite3's per-connection statement
+# cache is keyed by SQL text, so the long-lived connections reuse the compiled plans.
+_SQL_UPSERT_ERROR = """
+    INSERT INTO errors (error_hash, error_hash_i64, category, error_type, error_message,
+                        first_occurred, last_occurred, occurrence_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(error_hash_i64) WHERE resolved = 0 DO UPDATE SET
+        last_occurred = excluded.last_occurred,
+        occurrence_count = errors.occurrence_count + excluded.occurrence_count
+    RETURNING id
+"""
+
+# SQLite < 3.35: the same UPSERT without RETURNING, then the open row's id from the
+# unique hash index, read inside the same write transaction
+_SQL_UPSERT_ERROR_NO_RETURNING = _SQL_UPSERT_ERROR.replace('RETURNING id', '')
+_SQL_OPEN_ERROR_ID = "SELECT id FROM errors WHERE error_hash_i64 = ? AND resolved = 0"
+
+_SQL_INSERT_OCCURRENCE = """
+    INSERT INTO error_occurrences (
+        error_id, timestamp, category, source, context, stack_trace,
+        page_url, screenshot_path, console_logs, network_errors,
+        request_url, request_params, http_status, response_body,
+        domain, job_id, run_id, suite, test_id, test_name, extra_data
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Secondary indexes, created by _init_db and rebuilt after import_rows()
+_SQL_INDEXES = (
+    ('idx_errors_category', 'CREATE INDEX IF NOT EXISTS idx_errors_category ON errors(category)'),
+    # At most one open error per hash: the conflict target for log_error's UPSERT.
+    # Keyed on the 64-bit integer hash, which keeps the b-tree far smaller than hex TEXT.
+    ('idx_errors_hash_i64_unresolved', 'CREATE UNIQUE INDEX IF NOT EXISTS idx_errors_hash_i64_unresolved '
+                                       'ON errors(error_hash_i64) WHERE resolved = 0'),
+    # Composite indexes let the dashboard listing filter + ORDER BY without a sort
+    ('idx_errors_resolved_last', 'CREATE INDEX IF NOT EXISTS idx_errors_resolved_last '
+                                 'ON errors(resolved, last_occurred DESC)'),
+    ('idx_errors_resolved_cat_last', 'CREATE INDEX IF NOT EXISTS idx_errors_resolved_cat_last '
+                                     'ON errors(resolved, category, last_occurred DESC)'),
+    ('idx_occurrences_timestamp', 'CREATE INDEX IF NOT EXISTS idx_occurrences_timestamp '
+                                  'ON error_occurrences(timestamp)'),
+    ('idx_occurrences_error_ts', 'CREATE INDEX IF NOT EXISTS idx_occurrences_error_ts '
+                                 'ON error_occurrences(error_id, timestamp DESC)'),
+    ('idx_occurrences_category', 'CREATE INDEX IF NOT EXISTS idx_occurrences_category '
+                                 'ON error_occurrences(category)'),
+)
+
+# get_errors() listing, one fixed statement per (filter by category, include resolved,
+# keyset cursor) combination. The cursor carries the sort key of the previous page's
+# last row, so it stays valid if that row is deleted or recurs in the meantime.
+_SQL_LIST_ERRORS = {
+    (by_category, include_resolved, after): (
+        f"SELECT {_LIST_COLS} FROM errors WHERE 1=1"
+        + (" AND category = ?" if by_category else "")
+        + ("" if include_resolved else " AND resolved = 0")
+        + (" AND (last_occurred, -id) < (?, ?)" if after else "")
+        # Ties broken by id ascending: the order the (..., last_occurred DESC) indexes store rows in
+        + " ORDER BY last_occurred DESC, id LIMIT ? OFFSET ?"
+    )
+    for by_category in (False, True)
+    for include_resolved in (False, True)
+    for after in (False, True)
+}
+
+# import_rows(): ids are kept so restored occurrences still point at their errors
+_SQL_IMPORT_ERROR = """
+    INSERT INTO errors (id, error_hash, error_hash_i64, category, error_type, error_message,
+                        first_occurred, last_occurred, occurrence_count, resolved,
+                        resolution_notes, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+"""
+
+_OCCURRENCE_COLS = (
+    'id', 'error_id', 'timestamp', 'category', 'source', 'context', 'stack_trace',
+    'page_url', 'screenshot_path', 'console_logs', 'network_errors',
+    'request_url', 'request_params', 'http_status', 'response_body',
+    'domain', 'job_id', 'run_id', 'suite', 'test_id', 'test_name', 'extra_data',
+)
+_OCCURRENCE_JSON_COLS = frozenset({'console_logs', 'network_errors', 'request_params', 'extra_data'})
+# Caller-supplied columns bound as-is; _prepare_item reduces them to values sqlite3 can bind
+_OCCURRENCE_SCALAR_COLS = tuple(
+    col for col in _OCCURRENCE_COLS[4:] if col not in _OCCURRENCE_JSON_COLS
+)
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+_SQL_IMPORT_OCCURRENCE = (
+    f"INSERT INTO error_occurrences ({', '.join(_OCCURRENCE_COLS)}) "
+    f"VALUES ({', '.join('?' * len(_OCCURRENCE_COLS))})"
+)
+
+_SQL_STATS_BY_CATEGORY = """
+    SELECT category, resolved, COUNT(*) as count, SUM(occurrence_count) as total_occurrences
+    FROM errors GROUP BY category, resolved
+"""
+
+_SQL_STATS_MOST_FREQUENT = """
+    SELECT id, category, error_type, error_message,
+           occurrence_count, first_occurred, last_occurred
+    FROM errors WHERE resolved = 0
+    ORDER BY occurrence_count DESC LIMIT 10
+"""
+
+
+def _encode_json(value) -> Optional[str]:
+    """Encode a JSON column value; empty values are stored as NULL"""
+    if not value:
+        return None
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+def _decode_json(text: Optional[str], empty):
+    """Decode a JSON column value, returning ``empty`` for NULL"""
+    if not text:
+        return empty
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_file(path: str, mtime_ns: int) -> Dict:
+    """Parse the error_logging section of a config file (cached per path + mtime)"""
+    import yaml  # deferred: only paid for when a config file actually exists
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(path, 'r') as f:
+        config = yaml.load(f, Loader=loader) or {}
+    return config.get('error_logging', {})
+
 
 def load_error_config(config_path: str = None) -> Dict:
     """Load error logging configuration from config.yaml"""
@@ -37,13 +202,15 @@ def load_error_config(config_path: str = None) -> Dict:
     ])
 
     for path in search_paths:
-        if path.exists():
-            try:
-                with open(path, 'r') as f:
-                    config = yaml.safe_load(f) or {}
-                    return config.get('error_logging', {})
-            except Exception:
-                pass
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            continue
+        try:
+            # Copy so callers can't mutate the cached config
+            return copy.deepcopy(_load_config_file(str(path), mtime_ns))
+        except Exception:
+            pass
 
     return {
         'enabled': True,
@@ -57,12 +224,21 @@ class ErrorDatabase:
     """Unified SQLite database for storing all application errors"""
 
     def __init__(self, db_path: str = None, config_path: str = None,
-                 categories: Dict[str, str] = None):
+                 categories: Dict[str, str] = None, async_writes: bool = None):
         self.config = load_error_config(config_path)
         self.enabled = self.config.get('enabled', True)
         self.log_to_console = self.config.get('log_to_console', True)
         self.category_config = self.config.get('categories', {})
 
+        # Queue writes for a background thread instead of committing on the caller's thread
+        if async_writes is None:
+            async_writes = self.config.get('async_writes', False)
+        self.async_writes = async_writes
+        self._queue: "queue.Queue[Dict]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._writer_stop = threading.Event()
+
         # Merge default + config-defined + constructor-provided categories
         self.categories = dict(DEFAULT_CATEGORIES)
         config_cats = self.config.get('custom_categories', {})
@@ -71,14 +247,32 @@ class ErrorDatabase:
         if categories:
             self.categories.update(categories)
 
+        # One writer connection serialized by _write_lock, plus a pool of read-only connections.
+        # Re-entrant because ':memory:' reads borrow the writer (see _read).
+        self._write_lock = threading.RLock()
+        self._writer_conn: Optional[sqlite3.Connection] = None
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=READER_POOL_SIZE)
+        self._schema_ready = False
+        _open_databases.add(self)
+
+        # get_stats() memo: (expires_at, stats), cleared by every write
+        self._stats_cache = None
+        self._stats_lock = threading.Lock()
+        self._write_generation = 0
+
         if db_path:
             self.db_path = Path(db_path)
         else:
             self.db_path = Path(self.config.get('database_path', 'data/error_log.db'))
+        # ':memory:' lives in the writer connection; close() discards it and the next
+        # use starts over with an empty schema. Handy for tests.
+        self.in_memory = str(self.db_path) == ':memory:'
 
         if self.enabled:
-            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            if not self.in_memory:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
             self._init_db()
+            self._schema_ready = True
 
     def is_category_enabled(self, category: str) -> bool:
         """Check if a specific category is enabled for logging"""
@@ -86,13 +280,92 @@ class ErrorDatabase:
             return False
         return self.category_config.get(category, True)
 
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with the per-connection performance PRAGMAs applied"""
+        if read_only:
+            conn = sqlite3.connect(f'{self.db_path.resolve().as_uri()}?mode=ro', uri=True,
+                                   check_same_thread=False, isolation_level=None, cached_statements=256)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                   cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        # journal_mode=WAL is persistent and set once in _init_db; the rest are per-connection
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-65536')
+        return conn
+
+    @contextlib.contextmanager
+    def _write(self):
+        """Hold the write lock and yield the single writer connection, opening it on first use.
+
+        Writes are serialized here rather than by SQLite's file lock, so threads queue on a
+        cheap in-process lock instead of spinning on SQLITE_BUSY. The connection runs in
+        autocommit mode; multi-statement writes open their own transaction with
+        BEGIN IMMEDIATE and are committed by ``with conn:``.
+        """
+        with self._write_lock:
+            if self._writer_conn is None:
+                self._writer_conn = self._connect()
+                if self.in_memory and self._schema_ready:
+                    # Reopened after close(): the old in-memory database is gone
+                    self._init_db()
+            yield self._writer_conn
+
+    @contextlib.contextmanager
+    def _read(self):
+        """Borrow a read-only connection from the pool. WAL readers never wait on the writer."""
+        if self.in_memory:
+            # Every connection to ':memory:' is a separate database, so reads share the writer's
+            with self._write() as conn:
+                yield conn
+            return
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect(read_only=True)
+        try:
+            yield conn
+        finally:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        """Flush queued writes, stop the background writer and close every connection"""
+        self._stop_writer()
+        with self._write_lock:
+            if self._writer_conn is not None:
+                self._writer_conn.close()
+                self._writer_conn = None
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
     def _init_db(self):
         """Initialize the error database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"flask_error_tracker needs SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer; "
+                f"this Python is linked against SQLite {sqlite3.sqlite_version}. "
+                "Upgrade Python or the system SQLite library."
+            )
+        self._upsert_returning = sqlite3.sqlite_version_info >= _RETURNING_SQLITE_VERSION
+        with self._write() as conn, conn:
+            # WAL is persistent in the database file: readers no longer block on writers
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('BEGIN IMMEDIATE')
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS errors (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     error_hash TEXT NOT NULL,
+                    error_hash_i64 INTEGER,
                     category TEXT NOT NULL,
                     error_type TEXT,
                     error_message TEXT,
@@ -133,18 +406,65 @@ class ErrorDatabase:
                 )
             ''')
 
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_errors_category ON errors(category)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_errors_hash ON errors(error_hash)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_errors_resolved ON errors(resolved)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_occurrences_error_id ON error_occurrences(error_id)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_occurrences_timestamp ON error_occurrences(timestamp)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_occurrences_category ON error_occurrences(category)')
+            self._migrate_hashes(conn)
+            # Indexes replaced by the ones in _SQL_INDEXES
+            for name in ('idx_errors_hash', 'idx_errors_hash_unresolved', 'idx_errors_resolved',
+                         'idx_occurrences_error_id'):
+                conn.execute(f'DROP INDEX IF EXISTS {name}')
+            self._merge_duplicate_open_errors(conn)
+            for _name, ddl in _SQL_INDEXES:
+                conn.execute(ddl)
             conn.commit()
 
-    def _generate_error_hash(self, category: str, error_type: str, error_message: str) -> str:
-        """Generate a hash to identify unique errors for deduplication"""
-        normalized = f"{category}:{error_type}:{error_message[:200]}"
-        return hashlib.md5(normalized.encode()).hexdigest()
+    def _migrate_hashes(self, conn: sqlite3.Connection):
+        """Add error_hash_i64 if missing and recompute every hash written by an older scheme"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(errors)')}
+        if 'error_hash_i64' not in columns:
+            conn.execute('ALTER TABLE errors ADD COLUMN error_hash_i64 INTEGER')
+        elif conn.execute('PRAGMA user_version').fetchone()[0] >= _HASH_VERSION:
+            return
+        rows = conn.execute('SELECT id, category, error_type, error_message FROM errors').fetchall()
+        conn.executemany('UPDATE errors SET error_hash = ?, error_hash_i64 = ? WHERE id = ?', [
+            (*self._generate_error_hash(row['category'], row['error_type'] or '',
+                                        row['error_message'] or ''), row['id'])
+            for row in rows
+        ])
+        conn.execute(f'PRAGMA user_version = {_HASH_VERSION}')
+
+    @staticmethod
+    def _merge_duplicate_open_errors(conn: sqlite3.Connection):
+        """Fold duplicate unresolved rows (possible before the unique index existed) into the oldest one"""
+        duplicates = conn.execute('''
+            SELECT error_hash_i64, MIN(id) AS keep_id, SUM(occurrence_count) AS total,
+                   MIN(first_occurred) AS first_occurred, MAX(last_occurred) AS last_occurred
+            FROM errors WHERE resolved = 0
+            GROUP BY error_hash_i64 HAVING COUNT(*) > 1
+        ''').fetchall()
+        for row in duplicates:
+            conn.execute('''
+                UPDATE error_occurrences SET error_id = ? WHERE error_id IN (
+                    SELECT id FROM errors WHERE error_hash_i64 = ? AND resolved = 0 AND id != ?)
+            ''', (row['keep_id'], row['error_hash_i64'], row['keep_id']))
+            conn.execute(
+                "DELETE FROM errors WHERE error_hash_i64 = ? AND resolved = 0 AND id != ?",
+                (row['error_hash_i64'], row['keep_id'])
+            )
+            conn.execute(
+                "UPDATE errors SET occurrence_count = ?, first_occurred = ?, last_occurred = ? WHERE id = ?",
+                (row['total'], row['first_occurred'], row['last_occurred'], row['keep_id'])
+            )
+
+    def _generate_error_hash(self, category: str, error_type: str, error_message: str) -> Tuple[str, int]:
+        """
+        Generate the dedup key for an error: (hex digest, signed 64-bit integer).
+
+        The integer (first 8 bytes of the digest) is the indexed dedup key; the hex
+        form is kept in error_hash for readability and backward compatibility.
+        """
+        # NUL separators: ('a:b', 'c') and ('a', 'b:c') must not share a key
+        normalized = f"{category}\x00{error_type}\x00{error_message[:200]}"
+        digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+        return digest.hex(), int.from_bytes(digest[:8], 'big', signed=True)
 
     def log_error(
         self,
@@ -173,103 +493,262 @@ class ErrorDatabase:
         """Log an error occurrence. Deduplicates by incrementing count for matching errors."""
         if not self.is_category_enabled(category):
             return -1
-
-        # Auto-register unknown categories
-        if category not in self.categories:
-            self.categories[category] = category.replace('_', ' ').title()
-
-        if self.log_to_console:
-            print(f"❌ [{category.upper()}] {error_type}: {error_message[:100]}")
-
+        kwargs = dict(locals())
+        del kwargs['self']
+        item = self._prepare_item(kwargs)
+        if item is None:
+            return -1
+        if self.async_writes:
+            self._enqueue([item])
+            return 0  # queued; the id is assigned when the writer flushes
+        return self._write_errors([item])[0]
+
+    def log_errors_bulk(self, items: List[Dict]) -> int:
+        """
+        Log many error occurrences in a single transaction.
+
+        Each item is a dict of ``log_error`` keyword arguments. Returns the
+        number of occurrences written, or queued when ``async_writes`` is on
+        (items in disabled categories are skipped).
+        """
+        prepared = [self._prepare_item(item) for item in items]
+        if self.async_writes:
+            return self._enqueue([item for item in prepared
+                                  if item is not None and self.is_category_enabled(item['category'])])
+        return sum(1 for error_id in self._write_errors(prepared) if error_id > 0)
+
+    # ── Background writer ──
+
+    def _enqueue(self, items: List[Dict]) -> int:
+        """Hand items to the background writer, starting it on first use"""
+        if self._writer is None or not self._writer.is_alive():
+            with self._writer_lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer_stop.clear()
+                    self._writer = threading.Thread(
+                        target=self._run_writer, name='error-tracker-writer', daemon=True)
+                    self._writer.start()
+        for item in items:
+            self._queue.put_nowait(item)
+        return len(items)
+
+    def _run_writer(self):
+        """Drain the queue in batches of up to WRITER_BATCH_SIZE items or WRITER_FLUSH_INTERVAL seconds"""
+        while True:
+            if self._writer_stop.is_set() and self._queue.empty():
+                return
+            item = self._queue.get()
+            if item is _STOP_WRITER:
+                self._queue.task_done()
+                continue
+            batch = [item]
+            deadline = time.monotonic() + WRITER_FLUSH_INTERVAL
+            while len(batch) < WRITER_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP_WRITER:
+                    # Shutdown requested: write what we have right away
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[Dict]):
+        """Write one queued batch; if it fails, retry item by item so only the bad ones are dropped"""
+        try:
+            self._write_errors(batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                print(f"❌ [ERROR_TRACKER] Dropped a queued error: {e}")
+                return
+        for item in batch:
+            try:
+                self._write_errors([item])
+            except Exception as e:
+                print(f"❌ [ERROR_TRACKER] Dropped a queued error: {e}")
+
+    def flush(self):
+        """Block until every queued write has been committed (no-op without async_writes)"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.join()
+
+    def _stop_writer(self):
+        """Wake the writer immediately, let it drain the queue and wait for it to exit"""
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            return
+        self._writer_stop.set()
+        self._queue.put_nowait(_STOP_WRITER)
+        writer.join()
+        self._writer = None
+
+    def _write_errors(self, items: List[Optional[Dict]]) -> List[int]:
+        """
+        Write a batch of _prepare_item() results with one connection and one commit.
+        Returns ids per item (-1 for skipped ones).
+        """
+        error_ids = [-1] * len(items)
+        groups: Dict[Tuple[str, int], List[int]] = {}
+
+        for index, item in enumerate(items):
+            if item is None:
+                continue  # malformed: skipped alone instead of failing the whole batch
+            category = item['category']
+            if not self.is_category_enabled(category):
+                continue
+
+            # Auto-register unknown categories
+            if category not in self.categories:
+                self.categories[category] = category.replace('_', ' ').title()
+
+            if self.log_to_console:
+                print(f"❌ [{category.upper()}] {item['error_type']}: {item['error_message'][:100]}")
+
+            error_hashes = self._generate_error_hash(category, item['error_type'], item['error_message'])
+            groups.setdefault(error_hashes, []).append(index)
+
+        if not groups:
+            return error_ids
+
+        # One timestamp per batch (per flush with async_writes), shared by every item
         timestamp = datetime.now().isoformat()
-        error_hash = self._generate_error_hash(category, error_type, error_message)
-
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-
-            existing = conn.execute(
-                "SELECT id, occurrence_count FROM errors WHERE error_hash = ? AND resolved = 0",
-                (error_hash,)
-            ).fetchone()
 
-            if existing:
-                error_id = existing['id']
-                conn.execute(
-                    'UPDATE errors SET last_occurred = ?, occurrence_count = occurrence_count + 1 WHERE id = ?',
-                    (timestamp, error_id)
-                )
-            else:
-                cursor = conn.execute(
-                    '''INSERT INTO errors (error_hash, category, error_type, error_message,
-                       first_occurred, last_occurred, occurrence_count)
-                       VALUES (?, ?, ?, ?, ?, ?, 1)''',
-                    (error_hash, category, error_type, error_message, timestamp, timestamp)
-                )
-                error_id = cursor.lastrowid
-
-            conn.execute('''
-                INSERT INTO error_occurrences (
-                    error_id, timestamp, category, source, context, stack_trace,
-                    page_url, screenshot_path, console_logs, network_errors,
-                    request_url, request_params, http_status, response_body,
-                    domain, job_id, run_id, suite, test_id, test_name, extra_data
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                error_id, timestamp, category, source, context, stack_trace,
-                page_url, screenshot_path,
-                json.dumps(console_logs) if console_logs else None,
-                json.dumps(network_errors) if network_errors else None,
-                request_url,
-                json.dumps(request_params) if request_params else None,
-                http_status, response_body, domain, job_id, run_id, suite, test_id, test_name,
-                json.dumps(extra_data) if extra_data else None
-            ))
+        with self._write() as conn, conn:
+            conn.execute('BEGIN IMMEDIATE')
+
+            # Resolve one error row per distinct hash, then insert all occurrences at once
+            for (error_hash, error_hash_i64), indexes in groups.items():
+                first = items[indexes[0]]
+                params = (error_hash, error_hash_i64, first['category'], first['error_type'],
+                          first['error_message'], timestamp, timestamp, len(indexes))
+                # One statement: insert, or bump the open (unresolved) error with this hash
+                if self._upsert_returning:
+                    error_id = conn.execute(_SQL_UPSERT_ERROR, params).fetchone()[0]
+                else:
+                    conn.execute(_SQL_UPSERT_ERROR_NO_RETURNING, params)
+                    error_id = conn.execute(_SQL_OPEN_ERROR_ID, (error_hash_i64,)).fetchone()[0]
+
+                for index in indexes:
+                    error_ids[index] = error_id
+
+            rows = [
+                self._occurrence_row(error_ids[index], timestamp, items[index])
+                for indexes in groups.values() for index in indexes
+            ]
+            conn.executemany(_SQL_INSERT_OCCURRENCE, rows)
             conn.commit()
-            return error_id
+
+        self._invalidate_stats()
+        return error_ids
+
+    @staticmethod
+    def _prepare_item(item) -> Optional[Dict]:
+        """
+        Copy a ``log_error`` kwargs dict into its stored form, on the caller's thread.
+
+        error_type/error_message are coerced to str, the other scalar columns to a value
+        sqlite3 can bind, and the JSON columns encoded now: one bad item can't fail the
+        batch it is written with, and a queued item (async_writes) no longer shares mutable
+        state with the caller. Returns None when it can't be stored (not a dict, no usable
+        category, unencodable).
+        """
+        if not isinstance(item, dict):
+            return None
+        category = item.get('category')
+        if not category or not isinstance(category, str):
+            return None
+        prepared = dict(item)
+        for key in ('error_type', 'error_message'):
+            value = prepared.get(key)
+            prepared[key] = '' if value is None else str(value)
+        for key in _OCCURRENCE_SCALAR_COLS:
+            value = prepared.get(key)
+            if isinstance(value, int) and _INT64_MIN <= value <= _INT64_MAX:
+                continue
+            if value is not None and not isinstance(value, (str, float)):
+                prepared[key] = str(value)
+        try:
+            for key in _OCCURRENCE_JSON_COLS:
+                prepared[key] = _encode_json(prepared.get(key))
+        except (TypeError, ValueError):
+            return None
+        return prepared
+
+    @staticmethod
+    def _occurrence_row(error_id: int, timestamp: str, item: Dict) -> tuple:
+        """Build the error_occurrences parameter tuple for one prepared item (JSON already encoded)"""
+        get = item.get
+        return (
+            error_id, timestamp, item['category'], get('source'), get('context'), get('stack_trace'),
+            get('page_url'), get('screenshot_path'), get('console_logs'), get('network_errors'),
+            get('request_url'), get('request_params'),
+            get('http_status'), get('response_body'), get('domain'), get('job_id'), get('run_id'),
+            get('suite'), get('test_id'), get('test_name'), get('extra_data')
+        )
 
     def get_errors(self, category: str = None, include_resolved: bool = False,
-                   limit: int = 100, offset: int = 0) -> List[Dict]:
-        """Get errors with optional category filter"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            query = "SELECT * FROM errors WHERE 1=1"
-            params = []
-            if category:
-                query += " AND category = ?"
-                params.append(category)
-            if not include_resolved:
-                query += " AND resolved = 0"
-            query += " ORDER BY last_occurred DESC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
-            return [dict(row) for row in conn.execute(query, params).fetchall()]
+                   limit: int = 100, offset: int = 0, after: Tuple[str, int] = None) -> List[Dict]:
+        """
+        Get errors with optional category filter, most recently seen first.
+
+        Pass ``(last_occurred, id)`` of a page's last row as ``after`` to fetch the next
+        one (keyset pagination: cost doesn't grow with depth the way OFFSET does).
+        """
+        query = _SQL_LIST_ERRORS[bool(category), bool(include_resolved), after is not None]
+        params = [category] if category else []
+        if after is not None:
+            last_occurred, error_id = after
+            params += [last_occurred, -error_id]
+        params += [limit, offset]
+        with self._read() as conn:
+            return self._fetch_dicts(conn, query, params)
+
+    @staticmethod
+    def _fetch_dicts(conn: sqlite3.Connection, query: str, params=()) -> List[Dict]:
+        """Run a query and build plain dicts from raw tuples, sharing one interned key list"""
+        cursor = conn.cursor()
+        cursor.row_factory = None  # skip building an intermediate sqlite3.Row per row
+        cursor.execute(query, params)
+        cols = [sys.intern(d[0]) for d in cursor.description]
+        return [dict(zip(cols, row)) for row in cursor]
 
     def get_error_detail(self, error_id: int) -> Optional[Dict]:
         """Get detailed error info including all occurrences"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._read() as conn:
             error = conn.execute("SELECT * FROM errors WHERE id = ?", (error_id,)).fetchone()
             if not error:
                 return None
-            occurrences = conn.execute(
+            occurrences = self._fetch_dicts(
+                conn,
                 'SELECT * FROM error_occurrences WHERE error_id = ? ORDER BY timestamp DESC LIMIT 50',
                 (error_id,)
-            ).fetchall()
+            )
             return {
                 **dict(error),
-                'occurrences': [dict(o) for o in occurrences],
+                'occurrences': occurrences,
                 'category_label': self.categories.get(error['category'], error['category'])
             }
 
     def get_occurrence(self, occurrence_id: int) -> Optional[Dict]:
         """Get a specific occurrence"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._read() as conn:
             row = conn.execute("SELECT * FROM error_occurrences WHERE id = ?", (occurrence_id,)).fetchone()
             return dict(row) if row else None
 
     def add_note(self, error_id: int, note: str) -> bool:
         """Append a note to an error without marking it resolved"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn, conn:
+            conn.execute('BEGIN IMMEDIATE')
             existing = conn.execute(
                 "SELECT resolution_notes FROM errors WHERE id = ?", (error_id,)
             ).fetchone()
@@ -288,84 +767,162 @@ class ErrorDatabase:
 
     def mark_resolved(self, error_id: int, notes: str = None) -> bool:
         """Mark an error as resolved"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn, conn:
             cursor = conn.execute(
                 "UPDATE errors SET resolved = 1, resolution_notes = ? WHERE id = ?",
                 (notes, error_id)
             )
             conn.commit()
+            self._invalidate_stats()
             return cursor.rowcount > 0
 
     def delete_error(self, error_id: int) -> bool:
         """Delete an error and its occurrences"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn, conn:
+            conn.execute('BEGIN IMMEDIATE')
             conn.execute("DELETE FROM error_occurrences WHERE error_id = ?", (error_id,))
             cursor = conn.execute("DELETE FROM errors WHERE id = ?", (error_id,))
             conn.commit()
+            self._invalidate_stats()
             return cursor.rowcount > 0
 
     def clear_resolved(self) -> int:
         """Clear all resolved errors"""
-        with sqlite3.connect(self.db_path) as conn:
-            resolved_ids = [row[0] for row in conn.execute(
-                "SELECT id FROM errors WHERE resolved = 1"
-            ).fetchall()]
-            if resolved_ids:
-                placeholders = ','.join('?' * len(resolved_ids))
-                conn.execute(f"DELETE FROM error_occurrences WHERE error_id IN ({placeholders})", resolved_ids)
-                cursor = conn.execute("DELETE FROM errors WHERE resolved = 1")
-                conn.commit()
-                return cursor.rowcount
-            return 0
+        with self._write() as conn, conn:
+            conn.execute('BEGIN IMMEDIATE')
+            # Occurrences first: foreign_keys=ON rejects deleting errors they still reference
+            conn.execute(
+                "DELETE FROM error_occurrences WHERE error_id IN (SELECT id FROM errors WHERE resolved = 1)"
+            )
+            cursor = conn.execute("DELETE FROM errors WHERE resolved = 1")
+            conn.commit()
+        if cursor.rowcount:
+            self._invalidate_stats()
+        return cursor.rowcount
+
+    def import_rows(self, errors: Iterable[Dict], occurrences: Iterable[Dict] = ()) -> Tuple[int, int]:
+        """
+        Bulk-load error and occurrence rows, e.g. restoring a backup or merging another database.
+
+        Rows are dicts keyed by column name. Error ``id`` values are kept (omit them to let
+        SQLite assign new ones) so occurrences can reference them through ``error_id``.
+        Hashes are recomputed; JSON columns may be given as text or as lists/dicts.
+
+        Secondary indexes are dropped for the load and rebuilt once at the end, all in one
+        transaction: building an index in a single pass is much cheaper than updating every
+        index row by row. Any failure (duplicate id, dangling error_id) rolls back everything.
+        Returns (errors imported, occurrences imported).
+        """
+        def error_params(row):
+            get = row.get
+            return (
+                get('id'),
+                *self._generate_error_hash(row['category'], get('error_type') or '', get('error_message') or ''),
+                row['category'], get('error_type'), get('error_message'),
+                row['first_occurred'], row['last_occurred'],
+                get('occurrence_count', 1), get('resolved', 0), get('resolution_notes'), get('created_at'),
+            )
+
+        def occurrence_params(row):
+            get = row.get
+            return tuple(
+                _encode_json(get(col)) if col in _OCCURRENCE_JSON_COLS and not isinstance(get(col), str)
+                else get(col)
+                for col in _OCCURRENCE_COLS
+            )
+
+        with self._write() as conn, conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for name, _ddl in _SQL_INDEXES:
+                conn.execute(f'DROP INDEX IF EXISTS {name}')
+            errors_imported = conn.executemany(_SQL_IMPORT_ERROR, map(error_params, errors)).rowcount
+            occurrences_imported = conn.executemany(
+                _SQL_IMPORT_OCCURRENCE, map(occurrence_params, occurrences)).rowcount
+            # The unique open-hash index can't be rebuilt over duplicates, so fold them first
+            self._merge_duplicate_open_errors(conn)
+            for _name, ddl in _SQL_INDEXES:
+                conn.execute(ddl)
+            conn.commit()
+        self._invalidate_stats()
+        return max(errors_imported, 0), max(occurrences_imported, 0)
+
+    def _invalidate_stats(self):
+        """Drop the cached get_stats() result after a write"""
+        self._write_generation += 1
+        self._stats_cache = None
 
     def get_stats(self) -> Dict:
-        """Get error statistics by category"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            total = conn.execute("SELECT COUNT(*) as count FROM errors").fetchone()['count']
-            unresolved = conn.execute(
-                "SELECT COUNT(*) as count FROM errors WHERE resolved = 0"
-            ).fetchone()['count']
-            by_category = conn.execute('''
-                SELECT category, COUNT(*) as count, SUM(occurrence_count) as total_occurrences
-                FROM errors WHERE resolved = 0
-                GROUP BY category ORDER BY total_occurrences DESC
-            ''').fetchall()
-            frequent = conn.execute('''
-                SELECT id, category, error_type, error_message,
-                       occurrence_count, first_occurred, last_occurred
-                FROM errors WHERE resolved = 0
-                ORDER BY occurrence_count DESC LIMIT 10
-            ''').fetchall()
+        """Get error statistics by category. Cached for STATS_CACHE_TTL seconds or until the next write."""
+        cached = self._stats_cache
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        with self._stats_lock:
+            cached = self._stats_cache
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            generation = self._write_generation
+            stats = self._query_stats()
+            # Don't cache a result that raced with a write
+            if generation == self._write_generation:
+                self._stats_cache = (time.monotonic() + STATS_CACHE_TTL, stats)
+            return stats
+
+    def _query_stats(self) -> Dict:
+        """Run the stats aggregation queries"""
+        with self._read() as conn:
+            # One pass over errors yields the totals and the unresolved per-category breakdown
+            grouped = conn.execute(_SQL_STATS_BY_CATEGORY).fetchall()
+            total = unresolved = 0
+            by_category = []
+            for row in grouped:
+                total += row['count']
+                if not row['resolved']:
+                    unresolved += row['count']
+                    by_category.append({
+                        'category': row['category'],
+                        'count': row['count'],
+                        'total_occurrences': row['total_occurrences'],
+                        'category_label': self.categories.get(row['category'], row['category']),
+                    })
+            by_category.sort(key=lambda cat: cat['total_occurrences'], reverse=True)
+
+            most_frequent = self._fetch_dicts(conn, _SQL_STATS_MOST_FREQUENT)
             return {
                 'total_errors': total,
                 'unresolved_errors': unresolved,
                 'resolved_errors': total - unresolved,
-                'by_category': [
-                    {**dict(row), 'category_label': self.categories.get(row['category'], row['category'])}
-                    for row in by_category
-                ],
-                'most_frequent': [dict(row) for row in frequent],
+                'by_category': by_category,
+                'most_frequent': most_frequent,
                 'categories': self.categories,
             }
 
     def generate_debug_report(self, error_id: int, occurrence_id: int = None) -> str:
         """Generate a Markdown debug report suitable for any AI assistant or issue tracker."""
-        error = self.get_error_detail(error_id)
-        if not error:
-            return f"Error ID {error_id} not found"
-
-        if occurrence_id:
-            occurrence = self.get_occurrence(occurrence_id)
-        elif error['occurrences']:
-            occurrence = error['occurrences'][0]
-        else:
-            occurrence = {}
-
-        extra_data = json.loads(occurrence.get('extra_data') or '{}')
-        console_logs = json.loads(occurrence.get('console_logs') or '[]')
-
-        report = f"""## Error Debug Report
+        # Error row + the requested (or latest) occurrence in one query, instead of
+        # get_error_detail()'s 50-occurrence fetch plus a separate get_occurrence()
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            row = cursor.execute('''
+                SELECT e.*, o.* FROM errors e
+                LEFT JOIN error_occurrences o ON o.id = COALESCE(?, (
+                    SELECT id FROM error_occurrences WHERE error_id = e.id
+                    ORDER BY timestamp DESC LIMIT 1))
+                WHERE e.id = ?
+            ''', (occurrence_id or None, error_id)).fetchone()
+            if not row:
+                return f"Error ID {error_id} not found"
+            cols = [d[0] for d in cursor.description]
+
+        split = cols.index('id', 1)  # o.* starts at the second id column
+        error = dict(zip(cols[:split], row[:split]))
+        error['category_label'] = self.categories.get(error['category'], error['category'])
+        occurrence = dict(zip(cols[split:], row[split:])) if row[split] is not None else {}
+
+        extra_data = _decode_json(occurrence.get('extra_data'), {})
+        console_logs = _decode_json(occurrence.get('console_logs'), [])
+
+        parts = [f"""## Error Debug Report
 
 **Error ID**: {error_id}
 **Category**: {error['category_label']} (`{error['category']}`)
@@ -389,36 +946,50 @@ class ErrorDatabase:
 ```
 {occurrence.get('stack_trace') or 'No stack trace available'}
 ```
-"""
+"""]
         if occurrence.get('request_url'):
-            report += f"\n### Request\n- **URL**: {occurrence['request_url']}\n"
+            parts.append(f"\n### Request\n- **URL**: {occurrence['request_url']}\n")
             if occurrence.get('http_status'):
-                report += f"- **HTTP Status**: {occurrence['http_status']}\n"
+                parts.append(f"- **HTTP Status**: {occurrence['http_status']}\n")
             if occurrence.get('response_body'):
-                report += f"\n```\n{occurrence['response_body'][:500]}\n```\n"
+                parts.append(f"\n```\n{occurrence['response_body'][:500]}\n```\n")
 
         if occurrence.get('page_url'):
-            report += f"\n### Page URL\n{occurrence['page_url']}\n"
+            parts.append(f"\n### Page URL\n{occurrence['page_url']}\n")
 
         if console_logs:
             console_errors = [l for l in console_logs if l.get('type') == 'error']
             if console_errors:
-                report += f"\n### Console Errors ({len(console_errors)})\n```\n"
-                report += '\n'.join([f"[{l.get('type')}] {l.get('text', l.get('message', ''))}" for l in console_errors[:10]])
-                report += "\n```\n"
+                parts.append(f"\n### Console Errors ({len(console_errors)})\n```\n")
+                parts.append('\n'.join([f"[{l.get('type')}] {l.get('text', l.get('message', ''))}" for l in console_errors[:10]]))
+                parts.append("\n```\n")
 
         if extra_data:
-            report += f"\n### Extra Data\n```json\n{json.dumps(extra_data, indent=2)}\n```\n"
+            if orjson is not None:
+                extra_json = orjson.dumps(extra_data, default=str, option=orjson.OPT_INDENT_2).decode()
+            else:
+                extra_json = json.dumps(extra_data, indent=2, default=str)
+            parts.append(f"\n### Extra Data\n```json\n{extra_json}\n```\n")
 
         # Test-specific fields
         if occurrence.get('test_id'):
-            report += f"\n### Test Details\n"
-            report += f"- **Test**: `{occurrence.get('test_id')}` — {occurrence.get('test_name')}\n"
-            report += f"- **Suite**: {occurrence.get('suite')}\n"
-            report += f"- **Run ID**: {occurrence.get('run_id')}\n"
+            parts.append(f"\n### Test Details\n")
+            parts.append(f"- **Test**: `{occurrence.get('test_id')}` — {occurrence.get('test_name')}\n")
+            parts.append(f"- **Suite**: {occurrence.get('suite')}\n")
+            parts.append(f"- **Run ID**: {occurrence.get('run_id')}\n")
+
+        parts.append(f"\n---\n*This error has occurred {error['occurrence_count']} time(s). Please investigate and suggest a fix.*\n")
+        return ''.join(parts)
+
+
+# Open instances, so their connections are closed cleanly at interpreter exit
+_open_databases: "weakref.WeakSet[ErrorDatabase]" = weakref.WeakSet()
+
 
-        report += f"\n---\n*This error has occurred {error['occurrence_count']} time(s). Please investigate and suggest a fix.*\n"
-        return report
+@atexit.register
+def _close_open_databases():
+    for error_db in list(_open_databases):
+        error_db.close()
 
 
 # Singleton
@@ -437,4 +1008,6 @@ def get_error_db(db_path: str = None, config_path: str = None,
 def reset_error_db():
     """Reset the singleton (useful for testing)"""
     global _error_db
+    if _error_db is not None:
+        _error_db.close()
     _error_db = None
@@ -0,0 +1,110 @@
+"""
+WSGI middleware that injects the debug button snippet into HTML responses.
+"""
+
+from werkzeug.wsgi import ClosingIterator, FileWrapper
+
+
+class InjectDebugButton:
+    """
+    Wrap a WSGI app and insert ``snippet`` before the last ``</body>`` of HTML responses.
+
+    Unlike an ``after_request`` hook this never buffers the whole body: chunks are
+    passed through with a one-chunk lookahead and only the final chunk is searched.
+    Single-chunk (regular Flask) responses keep an accurate Content-Length; streamed
+    responses have it dropped since the final size is only known at the end.
+
+    Single-chunk bodies larger than ``max_body_bytes`` are passed through unchanged.
+
+    Usage:
+        app.wsgi_app = InjectDebugButton(app.wsgi_app, snippet_bytes)
+    """
+
+    _close_body = b'</body>'
+
+    def __init__(self, wsgi_app, snippet: bytes, max_body_bytes: int = None):
+        self.wsgi_app = wsgi_app
+        self.snippet = snippet
+        self.max_body_bytes = max_body_bytes
+
+    def __call__(self, environ, start_response):
+        state = {}
+
+        def _start_response(status, headers, exc_info=None):
+            if exc_info is not None or state.get('forward'):
+                state['forward'] = True
+                return start_response(status, headers, exc_info)
+            state['status'], state['headers'] = status, headers
+            return _write
+
+        def _write(data):
+            # Legacy write() callable: headers must go out now, so skip injection
+            if 'write' not in state:
+                state['forward'] = True
+                state['write'] = start_response(state['status'], state['headers'])
+            state['write'](data)
+
+        app_iter = self.wsgi_app(environ, _start_response)
+
+        if 'status' not in state:
+            # start_response not called yet (lazy app) or already forwarded
+            state['forward'] = True
+            return app_iter
+        if state.get('forward'):
+            return app_iter
+        if not self._should_inject(environ, state['status'], state['headers'], app_iter):
+            state['forward'] = True
+            start_response(state['status'], state['headers'])
+            return app_iter
+
+        body = self._inject(app_iter, start_response, state['status'], state['headers'])
+        if hasattr(app_iter, 'close'):
+            return ClosingIterator(body, app_iter.close)
+        return body
+
+    @staticmethod
+    def _should_inject(environ, status: str, headers, app_iter) -> bool:
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return False
+        # File responses (send_file): werkzeug's wrapper, or the server's own sendfile wrapper
+        # under gunicorn/uWSGI. Splicing would break their ETag/ranges and zero-copy sending.
+        server_wrapper = environ.get('wsgi.file_wrapper')
+        if isinstance(app_iter, FileWrapper) or (
+                isinstance(server_wrapper, type) and isinstance(app_iter, server_wrapper)):
+            return False
+        # Full pages only: not 206 ranges, 204/304 bodiless responses or error pages
+        if not status.startswith('200'):
+            return False
+        headers = {name.lower(): value for name, value in headers}
+        return ('text/html' in headers.get('content-type', '')
+                and 'content-encoding' not in headers)
+
+    def _splice(self, chunk: bytes) -> bytes:
+        idx = chunk.rfind(self._close_body)
+        if idx == -1:
+            return chunk
+        return chunk[:idx] + self.snippet + chunk[idx:]
+
+    def _inject(self, app_iter, start_response, status, headers):
+        chunks = iter(app_iter)
+        last = next(chunks, None)
+        following = next(chunks, None) if last is not None else None
+        headers = [(name, value) for name, value in headers if name.lower() != 'content-length']
+
+        if following is None:
+            # Whole body in one chunk: inject and send an exact Content-Length
+            body = last or b''
+            if self.max_body_bytes is None or len(body) <= self.max_body_bytes:
+                body = self._splice(body)
+            start_response(status, headers + [('Content-Length', str(len(body)))])
+            yield body
+            return
+
+        # Streamed body: hold back one chunk so the final one can be searched
+        start_response(status, headers)
+        yield last
+        last = following
+        for chunk in chunks:
+            yield last
+            last = chunk
+        yield self._splice(last)
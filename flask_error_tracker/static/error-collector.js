@@ -11,6 +11,7 @@
   const ERROR_ENDPOINT = window.__ERROR_COLLECTOR_ENDPOINT || "/api/log-frontend-error";
   const MAX_CONSOLE_LOGS = 50;
   const BATCH_INTERVAL = 5000;
+  const MAX_BATCH = 500; // matches the server's MAX_FRONTEND_BATCH
 
   let consoleLogs = [];
   let pendingErrors = [];
@@ -113,15 +114,16 @@
   }
 
   function flushErrors() {
-    if (pendingErrors.length === 0) return;
-    const batch = pendingErrors.splice(0, pendingErrors.length);
-    if (navigator.sendBeacon) {
-      navigator.sendBeacon(ERROR_ENDPOINT, JSON.stringify({ errors: batch }));
-    } else {
-      originalFetch(ERROR_ENDPOINT, {
-        method: "POST", headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ errors: batch }), keepalive: true,
-      }).catch(() => {});
+    while (pendingErrors.length > 0) {
+      const batch = pendingErrors.splice(0, MAX_BATCH);
+      if (navigator.sendBeacon) {
+        navigator.sendBeacon(ERROR_ENDPOINT, JSON.stringify({ errors: batch }));
+      } else {
+        originalFetch(ERROR_ENDPOINT, {
+          method: "POST", headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ errors: batch }), keepalive: true,
+        }).catch(() => {});
+      }
     }
   }
 
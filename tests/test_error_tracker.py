@@ -1,11 +1,18 @@
 """Tests for Flask Error Tracker"""
 
+import io
 import json
+from datetime import datetime
 import tempfile
 import os
+import sqlite3
+import subprocess
+import sys
+import threading
 import pytest
-from flask import Flask
+from flask import Flask, Response, render_template_string, send_file
 from flask_error_tracker import ErrorDatabase, init_error_tracker, get_error_db, DEFAULT_CATEGORIES
+from flask_error_tracker import blueprint, database
 from flask_error_tracker.database import reset_error_db
 
 
@@ -18,9 +25,20 @@ def reset_singleton():
 
 
 @pytest.fixture
-def db(tmp_path):
-    """Create a fresh ErrorDatabase for each test"""
-    return ErrorDatabase(db_path=str(tmp_path / "test_errors.db"))
+def db():
+    """Create a fresh in-memory ErrorDatabase for each test"""
+    error_db = ErrorDatabase(db_path=':memory:')
+    yield error_db
+    error_db.close()
+
+
+@pytest.fixture
+def disk_db(tmp_path):
+    """An on-disk ErrorDatabase, for tests of WAL, the reader pool and persistence"""
+    error_db = ErrorDatabase(db_path=str(tmp_path / "test_errors.db"))
+    yield error_db
+    # Closing the last connection checkpoints the WAL and removes the -wal/-shm sidecars
+    error_db.close()
 
 
 @pytest.fixture
@@ -34,6 +52,10 @@ def app(db):
     def boom():
         raise ValueError("Test explosion")
 
+    @app.route('/page')
+    def page():
+        return '<html><body><p>body</p></body></html>'
+
     return app
 
 
@@ -54,6 +76,74 @@ class TestErrorDatabase:
         detail = db.get_error_detail(eid1)
         assert detail['occurrence_count'] == 2
 
+    def test_resolved_error_reopens_as_new_entry(self, db):
+        eid1 = db.log_error(category='api', error_type='Timeout', error_message='Request timed out')
+        db.mark_resolved(eid1)
+        eid2 = db.log_error(category='api', error_type='Timeout', error_message='Request timed out')
+        assert eid2 != eid1
+        assert db.get_error_detail(eid2)['occurrence_count'] == 1
+
+    def test_duplicate_open_errors_merged_on_init(self, tmp_path):
+        path = str(tmp_path / "legacy.db")
+        legacy = ErrorDatabase(db_path=path)
+        eid = legacy.log_error(category='api', error_type='E', error_message='m')
+        with legacy._write() as conn:
+            conn.execute('DROP INDEX idx_errors_hash_i64_unresolved')
+            conn.execute(
+                "INSERT INTO errors (error_hash, error_hash_i64, category, error_type, error_message, "
+                "first_occurred, last_occurred, occurrence_count) SELECT error_hash, error_hash_i64, "
+                "category, error_type, error_message, "
+                "first_occurred, last_occurred, 2 FROM errors WHERE id = ?", (eid,))
+            conn.execute("INSERT INTO error_occurrences (error_id, timestamp, category) "
+                         "VALUES (last_insert_rowid(), '2026-01-01', 'api')")
+        legacy.close()
+
+        db = ErrorDatabase(db_path=path)
+        errors = db.get_errors()
+        assert len(errors) == 1
+        detail = db.get_error_detail(errors[0]['id'])
+        assert detail['occurrence_count'] == 3
+        assert len(detail['occurrences']) == 2
+
+    def test_hash_fields_are_unambiguous(self, db):
+        eid1 = db.log_error(category='api', error_type='a:b', error_message='c')
+        eid2 = db.log_error(category='api', error_type='a', error_message='b:c')
+        assert eid1 != eid2
+
+    def test_old_hash_scheme_is_rehashed(self, tmp_path):
+        path = str(tmp_path / "old_hashes.db")
+        old = ErrorDatabase(db_path=path)
+        eid = old.log_error(category='api', error_type='E', error_message='m')
+        with old._write() as conn:
+            conn.execute("UPDATE errors SET error_hash = 'old', error_hash_i64 = 1")
+            conn.execute('PRAGMA user_version = 0')
+        old.close()
+
+        db = ErrorDatabase(db_path=path)
+        assert db.log_error(category='api', error_type='E', error_message='m') == eid
+        assert db.get_error_detail(eid)['error_hash'] == db._generate_error_hash('api', 'E', 'm')[0]
+        db.close()
+
+    def test_legacy_database_gets_integer_hash(self, tmp_path):
+        path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE errors (id INTEGER PRIMARY KEY AUTOINCREMENT, error_hash TEXT NOT NULL, "
+            "category TEXT NOT NULL, error_type TEXT, error_message TEXT, first_occurred TEXT NOT NULL, "
+            "last_occurred TEXT NOT NULL, occurrence_count INTEGER DEFAULT 1, resolved INTEGER DEFAULT 0, "
+            "resolution_notes TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute(
+            "INSERT INTO errors (error_hash, category, error_type, error_message, first_occurred, last_occurred) "
+            "VALUES ('0123456789abcdef0123456789abcdef', 'api', 'E', 'm', '2026-01-01', '2026-01-01')")
+        conn.commit()
+        conn.close()
+
+        db = ErrorDatabase(db_path=path)
+        # md5-era row is re-keyed from its content, so it still dedupes
+        eid = db.log_error(category='api', error_type='E', error_message='m')
+        assert eid == 1
+        assert db.get_error_detail(eid)['occurrence_count'] == 2
+
     def test_get_errors(self, db):
         db.log_error(category='database', error_type='E1', error_message='msg1')
         db.log_error(category='api', error_type='E2', error_message='msg2')
@@ -61,6 +151,54 @@ class TestErrorDatabase:
         assert len(all_errors) == 2
         db_errors = db.get_errors(category='database')
         assert len(db_errors) == 1
+        assert 'error_hash' not in db_errors[0]
+        assert db_errors[0]['occurrence_count'] == 1
+
+    @pytest.mark.parametrize('category, include_resolved, expected', [
+        (None, False, {'m1'}),
+        (None, True, {'m1', 'm2', 'm3'}),
+        ('api', False, {'m1'}),
+        ('api', True, {'m1', 'm2'}),
+    ])
+    def test_get_errors_filter_variants(self, db, category, include_resolved, expected):
+        db.log_error(category='api', error_type='E', error_message='m1')
+        db.mark_resolved(db.log_error(category='api', error_type='E', error_message='m2'))
+        db.mark_resolved(db.log_error(category='database', error_type='E', error_message='m3'))
+        errors = db.get_errors(category=category, include_resolved=include_resolved)
+        assert {e['error_message'] for e in errors} == expected
+
+    @pytest.mark.parametrize('include_resolved', [False, True])
+    def test_get_errors_keyset_pages(self, db, include_resolved):
+        # One bulk batch shares a timestamp, so the cursor has to break ties on id
+        db.log_errors_bulk([{'category': 'api', 'error_type': 'E', 'error_message': f'm{i}'} for i in range(5)])
+        db.log_error(category='api', error_type='E', error_message='latest')
+        seen, after = [], None
+        while True:
+            page = db.get_errors(include_resolved=include_resolved, limit=2, after=after)
+            if not page:
+                break
+            seen += [e['id'] for e in page]
+            after = (page[-1]['last_occurred'], page[-1]['id'])
+        assert seen == [e['id'] for e in db.get_errors(include_resolved=include_resolved)]
+        assert len(seen) == 6
+
+    def test_get_errors_keyset_survives_cursor_row_changes(self, db):
+        db.log_errors_bulk([{'category': 'api', 'error_type': 'E', 'error_message': f'm{i}'} for i in range(6)])
+        expected = [e['id'] for e in db.get_errors()]
+        page = db.get_errors(limit=2)
+        db.delete_error(page[-1]['id'])
+        page = db.get_errors(limit=2, after=(page[-1]['last_occurred'], page[-1]['id']))
+        assert [e['id'] for e in page] == expected[2:4]
+        # The cursor row recurs: it moves to the top, the next page still continues after it
+        db.log_error(category='api', error_type='E', error_message=page[-1]['error_message'])
+        page = db.get_errors(limit=2, after=(page[-1]['last_occurred'], page[-1]['id']))
+        assert [e['id'] for e in page] == expected[4:6]
+
+    def test_listing_keeps_resolution_notes(self, db):
+        db.mark_resolved(db.log_error(category='api', error_type='E', error_message='m'), notes='fixed in v2')
+        error = db.get_errors(include_resolved=True)[0]
+        assert error['resolution_notes'] == 'fixed in v2'
+        assert error['created_at']
 
     def test_mark_resolved(self, db):
         eid = db.log_error(category='test', error_type='E', error_message='m')
@@ -80,6 +218,16 @@ class TestErrorDatabase:
         cleared = db.clear_resolved()
         assert cleared == 1
 
+    def test_clear_resolved_removes_their_occurrences(self, db):
+        for i in range(5):
+            db.mark_resolved(db.log_error(category='test', error_type='E', error_message=f'm{i}'))
+        kept = db.log_error(category='test', error_type='E', error_message='open')
+        assert db.clear_resolved() == 5
+        assert [e['id'] for e in db.get_errors(include_resolved=True)] == [kept]
+        with db._read() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM error_occurrences").fetchone()[0] == 1
+        assert db.clear_resolved() == 0
+
     def test_stats(self, db):
         db.log_error(category='database', error_type='E1', error_message='m1')
         db.log_error(category='api', error_type='E2', error_message='m2')
@@ -87,6 +235,45 @@ class TestErrorDatabase:
         assert stats['total_errors'] == 2
         assert stats['unresolved_errors'] == 2
 
+    def test_stats_by_category(self, db):
+        db.log_error(category='api', error_type='E1', error_message='m1')
+        db.log_errors_bulk([{'category': 'database', 'error_type': 'E2', 'error_message': 'm2'}] * 3)
+        db.mark_resolved(db.log_error(category='api', error_type='E3', error_message='m3'))
+        stats = db.get_stats()
+        assert (stats['total_errors'], stats['unresolved_errors'], stats['resolved_errors']) == (3, 2, 1)
+        assert stats['by_category'] == [
+            {'category': 'database', 'count': 1, 'total_occurrences': 3, 'category_label': 'Database'},
+            {'category': 'api', 'count': 1, 'total_occurrences': 1, 'category_label': 'API'},
+        ]
+
+    def test_stats_query_count(self, db):
+        db.log_error(category='api', error_type='E1', error_message='m1')
+        statements = []
+        with db._read() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                db.get_stats()
+            finally:
+                conn.set_trace_callback(None)
+        # One GROUP BY for every counter and the per-category breakdown, one for most_frequent
+        assert len(statements) == 2
+
+    def test_stats_cached_until_write(self, db):
+        db.log_error(category='api', error_type='E1', error_message='m1')
+        stats = db.get_stats()
+        assert db.get_stats() is stats
+        eid = db.log_error(category='api', error_type='E2', error_message='m2')
+        assert db.get_stats()['total_errors'] == 2
+        db.mark_resolved(eid)
+        assert db.get_stats()['unresolved_errors'] == 1
+        db.delete_error(eid)
+        assert db.get_stats()['total_errors'] == 1
+
+    def test_stats_cache_expires(self, db, monkeypatch):
+        monkeypatch.setattr(database, 'STATS_CACHE_TTL', 0)
+        stats = db.get_stats()
+        assert db.get_stats() is not stats
+
     def test_debug_report(self, db):
         eid = db.log_error(category='api', error_type='HTTPError', error_message='404 Not Found',
                            context='Fetching user data', request_url='https://api.example.com/users')
@@ -95,6 +282,93 @@ class TestErrorDatabase:
         assert 'HTTPError' in report
         assert '404 Not Found' in report
 
+    def test_debug_report_for_occurrence(self, db):
+        eid = db.log_error(category='api', error_type='E', error_message='m', context='first call')
+        db.log_error(category='api', error_type='E', error_message='m', context='second call')
+        occurrences = db.get_error_detail(eid)['occurrences']
+        first = next(o for o in occurrences if o['context'] == 'first call')
+        assert 'first call' in db.generate_debug_report(eid, occurrence_id=first['id'])
+        assert '**Occurrences**: 2 times' in db.generate_debug_report(eid, occurrence_id=first['id'])
+
+    def test_debug_report_keeps_long_stack_trace(self, db):
+        frames = ''.join(f'  File "app.py", line {i}, in handler_{i}\n    call()\n' for i in range(2000))
+        stack_trace = f'Traceback (most recent call last):\n{frames}ValueError: deep'
+        eid = db.log_error(category='api', error_type='ValueError', error_message='deep',
+                           stack_trace=stack_trace)
+        report = db.generate_debug_report(eid)
+        assert f'### Stack Trace\n```\n{stack_trace}\n```\n' in report
+
+    def test_debug_report_missing(self, db):
+        assert db.generate_debug_report(999) == 'Error ID 999 not found'
+        eid = db.log_error(category='api', error_type='E', error_message='m')
+        assert 'No context provided' in db.generate_debug_report(eid, occurrence_id=999)
+
+    def test_debug_report_sections(self, db):
+        eid = db.log_error(category='test', error_type='AssertionError', error_message='expected 1',
+                           request_url='https://api.example.com/users', http_status=404,
+                           page_url='https://app.example.com/users', test_id='T-1',
+                           test_name='loads users', suite='smoke', run_id='run-9')
+        report = db.generate_debug_report(eid)
+        assert '- **HTTP Status**: 404' in report
+        assert '### Page URL\nhttps://app.example.com/users' in report
+        assert '- **Test**: `T-1` — loads users' in report
+        assert report.endswith('Please investigate and suggest a fix.*\n')
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_json_fields_round_trip(self, db, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(database, 'orjson', None)
+        eid = db.log_error(category='api', error_type='E', error_message='m',
+                           console_logs=[{'type': 'error', 'text': 'boom'}],
+                           extra_data={'user': 42, 'when': datetime(2026, 1, 1)})
+        occurrence = db.get_error_detail(eid)['occurrences'][0]
+        assert json.loads(occurrence['console_logs']) == [{'type': 'error', 'text': 'boom'}]
+        assert json.loads(occurrence['extra_data'])['user'] == 42
+        report = db.generate_debug_report(eid)
+        assert '"user": 42' in report
+        assert '[error] boom' in report
+
+    def test_import_rows_round_trip(self, db, disk_db):
+        eid = disk_db.log_error(category='api', error_type='E', error_message='m',
+                                console_logs=[{'type': 'error', 'text': 'boom'}])
+        disk_db.log_error(category='api', error_type='E', error_message='m')
+        disk_db.mark_resolved(disk_db.log_error(category='database', error_type='D', error_message='gone'),
+                              notes='fixed')
+        with disk_db._read() as conn:
+            errors = [dict(row) for row in conn.execute("SELECT * FROM errors")]
+            occurrences = [dict(row) for row in conn.execute("SELECT * FROM error_occurrences")]
+
+        assert db.import_rows(errors, occurrences) == (2, 3)
+        assert db.get_errors(include_resolved=True) == disk_db.get_errors(include_resolved=True)
+        assert db.get_error_detail(eid)['occurrences'] == disk_db.get_error_detail(eid)['occurrences']
+        # The rebuilt unique index still dedups new occurrences onto the imported open error
+        assert db.log_error(category='api', error_type='E', error_message='m') == eid
+        with db._read() as conn:
+            names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {name for name, _ddl in database._SQL_INDEXES} <= names
+
+    def test_import_rows_encodes_json_values(self, db):
+        db.import_rows(
+            [{'id': 7, 'category': 'api', 'error_type': 'E', 'error_message': 'm',
+              'first_occurred': '2026-01-01T00:00:00', 'last_occurred': '2026-01-02T00:00:00'}],
+            [{'error_id': 7, 'timestamp': '2026-01-02T00:00:00', 'category': 'api',
+              'extra_data': {'user': 42}}],
+        )
+        occurrence = db.get_error_detail(7)['occurrences'][0]
+        assert json.loads(occurrence['extra_data']) == {'user': 42}
+
+    def test_import_rows_is_all_or_nothing(self, db):
+        with pytest.raises(sqlite3.IntegrityError):
+            db.import_rows(
+                [{'id': 1, 'category': 'api', 'error_type': 'E', 'error_message': 'm',
+                  'first_occurred': 'a', 'last_occurred': 'b'}],
+                [{'error_id': 999, 'timestamp': 'b', 'category': 'api'}],
+            )
+        assert db.get_errors(include_resolved=True) == []
+        with db._read() as conn:
+            names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert 'idx_errors_hash_i64_unresolved' in names
+
     def test_custom_categories(self, db):
         db.log_error(category='payments', error_type='ChargeError', error_message='Card declined')
         assert 'payments' in db.categories
@@ -106,10 +380,314 @@ class TestErrorDatabase:
         eid = db.log_error(category='test', error_type='E', error_message='m')
         assert eid == -1
 
+    def test_disabled_category_skips_hashing_and_sqlite(self, db, monkeypatch):
+        db.category_config['test'] = False
+
+        def fail(*args, **kwargs):
+            raise AssertionError('should not be reached for a disabled category')
+
+        monkeypatch.setattr(db, '_generate_error_hash', fail)
+        monkeypatch.setattr(db, '_write', fail)
+        assert db.log_error(category='test', error_type='E', error_message='m') == -1
+        assert db.log_errors_bulk([{'category': 'test', 'error_type': 'E', 'error_message': 'm'}]) == 0
+        db.category_config['muted'] = False
+        assert db.log_error(category='muted', error_type='E', error_message='m') == -1
+        assert 'muted' not in db.categories
+
+    def test_batch_shares_one_timestamp(self, db):
+        db.log_errors_bulk([{'category': 'api', 'error_type': 'E', 'error_message': f'm{i}'} for i in range(3)])
+        assert len({e['last_occurred'] for e in db.get_errors()}) == 1
+
+    def test_wal_journal_mode(self, disk_db):
+        with disk_db._connect() as conn:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+
+    def test_reader_connections_are_pooled(self, disk_db):
+        with disk_db._read() as first:
+            pass
+        with disk_db._read() as again:
+            assert again is first
+            with disk_db._read() as concurrent:
+                assert concurrent is not first
+
+    def test_reader_connections_are_read_only(self, disk_db):
+        with disk_db._read() as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM errors")
+
+    def test_readers_see_committed_writes(self, disk_db):
+        with disk_db._read() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM errors").fetchone()[0] == 0
+        disk_db.log_error(category='api', error_type='E', error_message='m')
+        assert len(disk_db.get_errors()) == 1
+
+    def test_reopens_after_close(self, disk_db):
+        disk_db.log_error(category='api', error_type='E', error_message='m')
+        disk_db.close()
+        assert len(disk_db.get_errors()) == 1
+        disk_db.log_error(category='api', error_type='E', error_message='other')
+        assert len(disk_db.get_errors()) == 2
+
+    def test_log_from_other_thread(self, db):
+        thread = threading.Thread(
+            target=db.log_error, kwargs={'category': 'worker', 'error_type': 'E', 'error_message': 'm'})
+        thread.start()
+        thread.join()
+        assert len(db.get_errors(category='worker')) == 1
+
+    def test_in_memory_nested_reads(self, db):
+        db.log_error(category='api', error_type='E', error_message='m')
+        with db._read() as outer:
+            with db._read() as inner:
+                assert inner is outer
+            assert len(db.get_errors()) == 1
+
+    def test_in_memory_reopens_empty_after_close(self, db):
+        db.log_error(category='api', error_type='E', error_message='m')
+        db.close()
+        assert db.get_errors() == []
+        db.log_error(category='api', error_type='E', error_message='m')
+        assert len(db.get_errors()) == 1
+
+    def test_listing_query_uses_index_without_sort(self, db):
+        with db._read() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM errors WHERE resolved = 0 AND category = ? "
+                "ORDER BY last_occurred DESC LIMIT 100", ('api',)
+            ).fetchall()
+        detail = ' '.join(row['detail'] for row in plan)
+        assert 'idx_errors_resolved_cat_last' in detail
+        assert 'TEMP B-TREE' not in detail
+
+    def test_old_sqlite_rejected_clearly(self, monkeypatch):
+        monkeypatch.setattr(database.sqlite3, 'sqlite_version_info', (3, 22, 0))
+        monkeypatch.setattr(database.sqlite3, 'sqlite_version', '3.22.0')
+        with pytest.raises(RuntimeError, match='SQLite 3.24.0 or newer'):
+            ErrorDatabase(db_path=':memory:')
+
+    def test_upsert_without_returning(self, monkeypatch):
+        monkeypatch.setattr(database.sqlite3, 'sqlite_version_info', (3, 31, 1))
+        error_db = ErrorDatabase(db_path=':memory:')
+        assert error_db._upsert_returning is False
+        first = error_db.log_error(category='api', error_type='E', error_message='m')
+        assert error_db.log_error(category='api', error_type='E', error_message='m') == first
+        assert error_db.log_errors_bulk([
+            {'category': 'api', 'error_type': 'E', 'error_message': 'm'},
+            {'category': 'api', 'error_type': 'E', 'error_message': 'other'},
+        ]) == 2
+        error_db.mark_resolved(first)
+        reopened = error_db.log_error(category='api', error_type='E', error_message='m')
+        assert reopened not in (-1, first)
+        counts = {e['id']: e['occurrence_count'] for e in error_db.get_errors(include_resolved=True)}
+        assert counts[first] == 3 and counts[reopened] == 1
+        detail = error_db.get_error_detail(first)
+        assert len(detail['occurrences']) == 3
+        error_db.close()
+
+    def test_connection_pragmas(self, disk_db):
+        with disk_db._write() as conn:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+            assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+            assert conn.execute('PRAGMA foreign_keys').fetchone()[0] == 1
+            with pytest.raises(sqlite3.IntegrityError):
+                conn.execute("INSERT INTO error_occurrences (error_id, category, timestamp) "
+                             "VALUES (999, 'api', 'now')")
+
+    def test_close_removes_wal_sidecars(self, tmp_path):
+        path = tmp_path / "sidecars.db"
+        error_db = ErrorDatabase(db_path=str(path))
+        error_db.log_error(category='api', error_type='E', error_message='m')
+        error_db.close()
+        assert path.exists()
+        assert not (tmp_path / "sidecars.db-wal").exists()
+        assert not (tmp_path / "sidecars.db-shm").exists()
+
+    def test_bulk_skips_only_malformed_items(self, db):
+        logged = db.log_errors_bulk([
+            {'category': 'api', 'error_type': 'E', 'error_message': 'good'},
+            {'category': 'api', 'error_type': None, 'error_message': None},
+            {'category': 'api', 'error_type': 'E', 'error_message': 404},
+            {'error_type': 'E', 'error_message': 'no category'},
+            'not a dict',
+        ])
+        assert logged == 3
+        assert sorted(e['error_message'] for e in db.get_errors()) == ['', '404', 'good']
+
+    def test_concurrent_bulk_writers(self, db):
+        def write(n):
+            db.log_errors_bulk([{'category': 'worker', 'error_type': 'E', 'error_message': f'm{i % 5}'}
+                                for i in range(50)])
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        errors = db.get_errors(category='worker')
+        assert len(errors) == 5
+        assert sum(e['occurrence_count'] for e in errors) == 200
+
     def test_default_categories_present(self, db):
         for cat in DEFAULT_CATEGORIES:
             assert cat in db.categories
 
+    def test_log_errors_bulk(self, db):
+        logged = db.log_errors_bulk([
+            {'category': 'frontend', 'error_type': 'TypeError', 'error_message': 'x is undefined'},
+            {'category': 'frontend', 'error_type': 'TypeError', 'error_message': 'x is undefined'},
+            {'category': 'api', 'error_type': 'Timeout', 'error_message': 'Request timed out'},
+        ])
+        assert logged == 3
+        errors = db.get_errors()
+        assert len(errors) == 2
+        frontend = db.get_error_detail(db.get_errors(category='frontend')[0]['id'])
+        assert frontend['occurrence_count'] == 2
+        assert len(frontend['occurrences']) == 2
+
+    def test_log_errors_bulk_dedupes_against_existing(self, db):
+        eid = db.log_error(category='api', error_type='E', error_message='m')
+        db.log_errors_bulk([{'category': 'api', 'error_type': 'E', 'error_message': 'm'}])
+        assert db.get_error_detail(eid)['occurrence_count'] == 2
+
+    def test_log_errors_bulk_coerces_scalar_columns(self, db):
+        logged = db.log_errors_bulk([
+            {'category': 'api', 'error_type': 'E', 'error_message': 'good'},
+            {'category': 'api', 'error_type': 'E', 'error_message': 'odd', 'http_status': {'x': 1},
+             'source': ['a'], 'job_id': 2 ** 70, 'response_body': b'raw'},
+        ])
+        assert logged == 2
+        odd = next(e for e in db.get_errors() if e['error_message'] == 'odd')
+        occurrence = db.get_error_detail(odd['id'])['occurrences'][0]
+        assert occurrence['http_status'] == "{'x': 1}"
+        assert occurrence['source'] == "['a']"
+        assert occurrence['job_id'] == 2 ** 70  # INTEGER affinity stores the oversized int as REAL
+
+    def test_log_errors_bulk_skips_disabled(self, db):
+        db.category_config['test'] = False
+        logged = db.log_errors_bulk([
+            {'category': 'test', 'error_type': 'E', 'error_message': 'm'},
+            {'category': 'api', 'error_type': 'E', 'error_message': 'm'},
+        ])
+        assert logged == 1
+
+
+class TestAsyncWrites:
+    @pytest.fixture
+    def async_db(self, tmp_path):
+        error_db = ErrorDatabase(db_path=str(tmp_path / "async_errors.db"), async_writes=True)
+        yield error_db
+        error_db.close()
+
+    def test_log_error_is_queued(self, async_db):
+        assert async_db.log_error(category='api', error_type='E', error_message='m') == 0
+        async_db.log_error(category='api', error_type='E', error_message='m')
+        async_db.flush()
+        errors = async_db.get_errors()
+        assert len(errors) == 1
+        assert errors[0]['occurrence_count'] == 2
+
+    def test_bulk_is_queued(self, async_db):
+        async_db.category_config['test'] = False
+        queued = async_db.log_errors_bulk([
+            {'category': 'frontend', 'error_type': 'E', 'error_message': f'm{i}'} for i in range(300)
+        ] + [{'category': 'test', 'error_type': 'E', 'error_message': 'm'}])
+        assert queued == 300
+        async_db.flush()
+        assert async_db.get_stats()['total_errors'] == 300
+
+    def test_queued_items_are_detached_from_caller(self, async_db):
+        extra = {'step': 1}
+        logs = [{'type': 'error', 'text': 'first'}]
+        async_db.log_error(category='api', error_type='E', error_message='m',
+                           console_logs=logs, extra_data=extra)
+        extra['step'] = 2
+        logs.append(object())  # would not even be JSON-encodable later
+        async_db.flush()
+        occurrence = async_db.get_error_detail(async_db.get_errors()[0]['id'])['occurrences'][0]
+        assert json.loads(occurrence['extra_data']) == {'step': 1}
+        assert json.loads(occurrence['console_logs']) == [{'type': 'error', 'text': 'first'}]
+
+    def test_unencodable_item_does_not_drop_batch(self, async_db):
+        circular = {}
+        circular['self'] = circular
+        assert async_db.log_errors_bulk([
+            {'category': 'api', 'error_type': 'E', 'error_message': 'bad', 'extra_data': circular},
+            {'category': 'api', 'error_type': 'E', 'error_message': 'good'},
+        ]) == 1
+        async_db.flush()
+        assert [e['error_message'] for e in async_db.get_errors()] == ['good']
+
+    def test_non_scalar_value_does_not_drop_other_callers(self, async_db):
+        async_db.log_error(category='api', error_type='E', error_message='before')
+        async_db.log_error(category='api', error_type='E', error_message='odd', context={'not': 'scalar'})
+        async_db.log_error(category='api', error_type='E', error_message='after')
+        async_db.flush()
+        assert {e['error_message'] for e in async_db.get_errors()} == {'before', 'odd', 'after'}
+
+    def test_failed_batch_is_retried_per_item(self, async_db, monkeypatch, capsys):
+        write_errors = async_db._write_errors
+
+        def failing_write(items):
+            if any(item['error_message'] == 'poison' for item in items):
+                raise sqlite3.IntegrityError('boom')
+            return write_errors(items)
+
+        monkeypatch.setattr(async_db, '_write_errors', failing_write)
+        async_db.log_errors_bulk([
+            {'category': 'api', 'error_type': 'E', 'error_message': message}
+            for message in ('before', 'poison', 'after')
+        ])
+        async_db.flush()
+        assert {e['error_message'] for e in async_db.get_errors()} == {'before', 'after'}
+        assert capsys.readouterr().out.count('Dropped a queued error') == 1
+
+    def test_close_drains_queue(self, async_db):
+        async_db.log_error(category='api', error_type='E', error_message='m')
+        async_db.close()
+        assert len(async_db.get_errors()) == 1
+
+    def test_config_enables_async_writes(self, tmp_path):
+        config = tmp_path / 'config.yaml'
+        config.write_text('error_logging:\n  async_writes: true\n')
+        error_db = ErrorDatabase(db_path=str(tmp_path / 'e.db'), config_path=str(config))
+        assert error_db.async_writes is True
+        error_db.close()
+
+
+class TestConfig:
+    def test_config_loaded_from_file(self, tmp_path):
+        config = tmp_path / 'config.yaml'
+        config.write_text('error_logging:\n  log_to_console: false\n  categories:\n    test: false\n')
+        error_db = ErrorDatabase(db_path=str(tmp_path / 'e.db'), config_path=str(config))
+        assert error_db.log_to_console is False
+        assert error_db.log_error(category='test', error_type='E', error_message='m') == -1
+
+    def test_cached_config_is_not_shared(self, tmp_path):
+        config = tmp_path / 'config.yaml'
+        config.write_text('error_logging:\n  categories:\n    api: true\n')
+        first = database.load_error_config(str(config))
+        first['categories']['api'] = False
+        assert database.load_error_config(str(config))['categories']['api'] is True
+
+    def test_yaml_not_imported_without_config(self, tmp_path):
+        code = ("import sys; from flask_error_tracker import ErrorDatabase; "
+                "ErrorDatabase(db_path='e.db'); print('yaml' in sys.modules)")
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env,
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == 'False'
+
+    def test_config_reloaded_when_file_changes(self, tmp_path):
+        config = tmp_path / 'config.yaml'
+        config.write_text('error_logging:\n  log_to_console: true\n')
+        assert database.load_error_config(str(config))['log_to_console'] is True
+        config.write_text('error_logging:\n  log_to_console: false\n')
+        stat = config.stat()
+        os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert database.load_error_config(str(config))['log_to_console'] is False
+
 
 class TestBlueprint:
     def test_dashboard_loads(self, client):
@@ -117,6 +695,18 @@ class TestBlueprint:
         assert resp.status_code == 200
         assert b'Error Log' in resp.data
 
+    def test_dashboard_etag(self, client, db):
+        resp = client.get('/error-log')
+        etag = resp.headers['ETag']
+        assert 'no-cache' in resp.headers['Cache-Control']
+        resp = client.get('/error-log', headers={'If-None-Match': etag})
+        assert resp.status_code == 304
+        assert resp.data == b''
+        db.log_error(category='api', error_type='E', error_message='new row')
+        resp = client.get('/error-log', headers={'If-None-Match': etag})
+        assert resp.status_code == 200
+        assert b'new row' in resp.data
+
     def test_api_errors(self, client, db):
         db.log_error(category='api', error_type='E', error_message='m')
         resp = client.get('/api/errors')
@@ -124,6 +714,39 @@ class TestBlueprint:
         assert data['success']
         assert len(data['errors']) == 1
 
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_api_json_responses(self, client, db, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(blueprint, 'orjson', None)
+        db.log_error(category='api', error_type='E', error_message='m')
+        resp = client.get('/api/errors/stats')
+        assert resp.mimetype == 'application/json'
+        assert resp.get_json()['total_errors'] == 1
+        resp = client.get('/api/errors/999')
+        assert resp.status_code == 404
+        assert resp.get_json() == {'success': False, 'error': 'Error not found'}
+
+    def test_api_errors_pagination(self, client, db):
+        db.log_errors_bulk([{'category': 'api', 'error_type': 'E', 'error_message': f'm{i}'} for i in range(3)])
+        first = client.get('/api/errors?limit=2').get_json()
+        assert len(first['errors']) == 2
+        db.delete_error(first['errors'][-1]['id'])
+        second = client.get('/api/errors', query_string={'limit': 2, 'cursor': first['next_cursor']}).get_json()
+        assert len(second['errors']) == 1
+        assert second['next_cursor'] is None
+        assert [e['id'] for e in first['errors'][:1] + second['errors']] == [e['id'] for e in db.get_errors()]
+
+    def test_api_errors_rejects_bad_cursor(self, client):
+        resp = client.get('/api/errors?cursor=nope')
+        assert resp.status_code == 400
+        assert resp.get_json()['success'] is False
+
+    def test_api_errors_limit_is_clamped(self, client, db, monkeypatch):
+        monkeypatch.setattr(blueprint, 'MAX_LIST_LIMIT', 2)
+        db.log_errors_bulk([{'category': 'api', 'error_type': 'E', 'error_message': f'm{i}'} for i in range(3)])
+        assert len(client.get('/api/errors?limit=50').get_json()['errors']) == 2
+        assert client.get('/api/errors?limit=abc').status_code == 200
+
     def test_api_error_detail(self, client, db):
         eid = db.log_error(category='api', error_type='E', error_message='m')
         resp = client.get(f'/api/errors/{eid}')
@@ -160,6 +783,91 @@ class TestBlueprint:
         data = json.loads(resp.data)
         assert data['logged'] == 1
 
+    def test_frontend_error_batch(self, client, db):
+        resp = client.post('/api/log-frontend-error', json={
+            'errors': [{'error_type': 'TypeError', 'error_message': 'a'}] * 3
+                      + [{'error_type': 'RangeError', 'error_message': 'b'}]
+        })
+        assert json.loads(resp.data)['logged'] == 4
+        assert len(db.get_errors(category='frontend')) == 2
+
+    def test_frontend_errors_as_msgpack(self, client, db):
+        ormsgpack = pytest.importorskip('ormsgpack')
+        body = ormsgpack.packb({'errors': [{'error_type': 'TypeError', 'error_message': 'packed'}] * 2})
+        resp = client.post('/api/log-frontend-error', data=body, content_type='application/x-msgpack')
+        assert resp.get_json()['logged'] == 2
+        assert db.get_errors(category='frontend')[0]['occurrence_count'] == 2
+        resp = client.post('/api/log-frontend-error', data=b'\xc1', content_type='application/msgpack')
+        assert resp.status_code == 400
+
+    def test_msgpack_without_extra_is_415(self, client, db, monkeypatch):
+        monkeypatch.setattr(blueprint, 'ormsgpack', None)
+        resp = client.post('/api/log-frontend-error', data=b'\x80', content_type='application/msgpack')
+        assert resp.status_code == 415
+        assert db.get_errors() == []
+
+    def test_frontend_batch_is_capped(self, client, db, monkeypatch):
+        monkeypatch.setattr(blueprint, 'MAX_FRONTEND_BATCH', 3)
+        resp = client.post('/api/log-frontend-error', json={
+            'errors': [{'error_type': 'TypeError', 'error_message': f'm{i}'} for i in range(5)]
+        })
+        assert resp.get_json() == {'success': True, 'logged': 3, 'dropped': 2}
+        assert len(db.get_errors(category='frontend')) == 3
+
+    def test_frontend_batch_with_malformed_items(self, client, db):
+        resp = client.post('/api/log-frontend-error', json={'errors': [
+            {'error_type': 'TypeError', 'error_message': 'good'},
+            {'error_type': 'TypeError', 'error_message': None},
+            {'error_type': 'TypeError', 'error_message': 12},
+            'not an object',
+        ]})
+        assert resp.get_json()['logged'] == 3
+        assert 'good' in {e['error_message'] for e in db.get_errors(category='frontend')}
+
+    def test_frontend_batch_with_non_scalar_fields(self, client, db):
+        resp = client.post('/api/log-frontend-error', json={'errors': [
+            {'error_message': 'good'},
+            {'error_message': 'bad', 'http_status': {'x': 1}, 'source': ['a', 'b']},
+        ]})
+        assert resp.get_json()['logged'] == 2
+        assert {e['error_message'] for e in db.get_errors(category='frontend')} == {'good', 'bad'}
+
+    def test_frontend_errors_must_be_a_list(self, client):
+        resp = client.post('/api/log-frontend-error', json={'errors': 'oops'})
+        assert resp.status_code == 400
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_frontend_beacon_text_plain(self, client, db, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(blueprint, 'orjson', None)
+        body = json.dumps({'errors': [{'error_type': 'TypeError', 'error_message': 'beacon'}]})
+        resp = client.post('/api/log-frontend-error', data=body, content_type='text/plain;charset=UTF-8')
+        assert resp.get_json()['logged'] == 1
+
+    @pytest.mark.parametrize('body', [b'{not json', b'[1, 2]', b'\xff'])
+    def test_invalid_json_body_rejected(self, client, db, body):
+        eid = db.log_error(category='api', error_type='E', error_message='m')
+        resp = client.post(f'/api/errors/{eid}/resolve', data=body, content_type='application/json')
+        assert resp.status_code == 400
+        assert resp.get_json()['success'] is False
+        assert db.get_errors()[0]['resolved'] == 0
+
+    def test_resolve_with_empty_body(self, client, db):
+        eid = db.log_error(category='api', error_type='E', error_message='m')
+        assert client.post(f'/api/errors/{eid}/resolve').get_json()['success']
+
+    def test_singleton_resolved_once_at_init(self, tmp_path, monkeypatch):
+        singleton = get_error_db(db_path=str(tmp_path / "singleton.db"))
+        app = Flask(__name__)
+        init_error_tracker(app)
+
+        def fail(*args, **kwargs):
+            raise AssertionError('routes should use the database bound at init')
+
+        monkeypatch.setattr(blueprint, 'get_error_db', fail)
+        singleton.log_error(category='api', error_type='E', error_message='m')
+        assert len(app.test_client().get('/api/errors').get_json()['errors']) == 1
+
     def test_flask_error_handler(self, client, db):
         resp = client.get('/boom')
         assert resp.status_code == 500
@@ -167,9 +875,128 @@ class TestBlueprint:
         assert len(errors) == 1
         assert 'Test explosion' in errors[0]['error_message']
 
+    def test_flask_error_handler_captures_traceback(self, client, db):
+        client.get('/boom')
+        stack_trace = db.get_error_detail(db.get_errors(category='server')[0]['id'])['occurrences'][0]['stack_trace']
+        assert stack_trace.startswith('Traceback (most recent call last):')
+        assert 'in boom' in stack_trace
+        assert stack_trace.rstrip().endswith('ValueError: Test explosion')
+
+    def test_http_exceptions_pass_through(self, client, db):
+        assert client.get('/no-such-page').status_code == 404
+        assert client.post('/boom').status_code == 405
+        assert db.get_errors(category='server') == []
+
     def test_clear_resolved(self, client, db):
         eid = db.log_error(category='api', error_type='E', error_message='m')
         db.mark_resolved(eid)
         resp = client.post('/api/errors/clear-resolved')
         data = json.loads(resp.data)
         assert data['cleared'] == 1
+
+    def test_debug_button_injected(self, client):
+        resp = client.get('/page')
+        html = resp.data.decode()
+        assert 'debug-button.js' in html
+        assert html.index('debug-button.js') < html.index('</body>')
+        assert html.endswith('</body></html>')
+        assert resp.content_length == len(resp.data)
+
+    def test_debug_button_not_injected_into_json(self, client):
+        resp = client.get('/api/errors/stats')
+        assert b'debug-button.js' not in resp.data
+
+    def test_debug_button_injected_into_streamed_page(self, app, client):
+        @app.route('/stream')
+        def stream():
+            return Response(iter([b'<html><body>', b'<p>chunk</p>', b'</body></html>']),
+                            mimetype='text/html')
+
+        html = client.get('/stream').data.decode()
+        assert html.index('<p>chunk</p>') < html.index('debug-button.js') < html.index('</body>')
+
+
+class TestInjectModes:
+    def make_client(self, db, inject, **kwargs):
+        app = Flask(__name__)
+        init_error_tracker(app, error_db=db, inject=inject, **kwargs)
+
+        @app.route('/page')
+        def page():
+            return '<html><body></body></html>'
+
+        @app.route('/big')
+        def big():
+            return '<html><body>' + 'x' * 1000 + '</body></html>'
+
+        @app.route('/stream')
+        def stream():
+            return Response(iter([b'<html><body>', b'</body></html>']), mimetype='text/html')
+
+        @app.route('/templated')
+        def templated():
+            return render_template_string('<body>{{ error_tracker_snippet }}</body>')
+
+        @app.route('/file.html')
+        def file_html():
+            return send_file(io.BytesIO(b'<html><body></body></html>'), mimetype='text/html')
+
+        @app.route('/partial')
+        def partial():
+            return '<html><body></body></html>', 206
+
+        return app.test_client()
+
+    @pytest.mark.parametrize('inject', ['middleware', 'after_request'])
+    def test_no_body_size_limit(self, db, inject):
+        client = self.make_client(db, inject, max_inject_body_bytes=None)
+        resp = client.get('/big')
+        assert resp.status_code == 200
+        assert b'debug-button.js' in resp.data
+
+    def test_middleware_skips_server_file_wrapper(self, db):
+        class ServerFileWrapper:
+            """Stands in for gunicorn/uWSGI's environ['wsgi.file_wrapper']"""
+            def __init__(self, file, block_size=8192):
+                self.file, self.block_size = file, block_size
+
+            def __iter__(self):
+                return iter(lambda: self.file.read(self.block_size), b'')
+
+            def close(self):
+                self.file.close()
+
+        client = self.make_client(db, 'middleware')
+        resp = client.get('/file.html', environ_overrides={'wsgi.file_wrapper': ServerFileWrapper})
+        assert resp.data == b'<html><body></body></html>'
+
+    def test_middleware_only_injects_full_pages(self, db):
+        client = self.make_client(db, 'middleware')
+        assert b'debug-button.js' not in client.get('/partial').data
+        assert b'debug-button.js' in client.get('/page').data
+
+    def test_unknown_inject_mode_rejected(self, db):
+        with pytest.raises(ValueError):
+            init_error_tracker(Flask(__name__), error_db=db, inject='middlewear')
+
+    def test_after_request_mode(self, db):
+        client = self.make_client(db, 'after_request')
+        assert b'debug-button.js' in client.get('/page').data
+
+    def test_template_mode(self, db):
+        client = self.make_client(db, 'template')
+        assert b'debug-button.js' not in client.get('/page').data
+        html = client.get('/templated').data.decode()
+        assert html.count('debug-button.js') == 1
+
+    def test_after_request_skips_streamed(self, db):
+        client = self.make_client(db, 'after_request')
+        assert b'debug-button.js' not in client.get('/stream').data
+
+    @pytest.mark.parametrize('inject', ['middleware', 'after_request'])
+    def test_body_size_limit(self, db, inject):
+        client = self.make_client(db, inject, max_inject_body_bytes=500)
+        assert b'debug-button.js' in client.get('/page').data
+        resp = client.get('/big')
+        assert b'debug-button.js' not in resp.data
+        assert resp.content_length == len(resp.data)